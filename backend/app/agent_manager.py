@@ -4,7 +4,6 @@ Agent manager with structured streaming outputs.
 
 import json
 from typing import AsyncGenerator
-from openai import AsyncOpenAI
 from app.models import (
     ToolOutput,
     ToolResultOutput,
@@ -15,6 +14,7 @@ from app.models import (
 from app.tools import tools
 from app.models.context import Context
 from app.logger import get_logger
+from app.openai_client import get_openai_client
 
 logger = get_logger(__name__)
 
@@ -23,7 +23,7 @@ class AgentManager:
     """Manages agent interactions with structured streaming."""
 
     def __init__(self, api_key: str, model: str = "gpt-4.1"):
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = get_openai_client(api_key)
         self.model = model
         logger.info(f"AgentManager initialized with model: {model}")
 
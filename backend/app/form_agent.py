@@ -7,7 +7,6 @@ Uses OpenAI tool calling with `emit_text` + `emit_form`.
 
 import json
 from typing import AsyncGenerator
-from openai import AsyncOpenAI
 from app.models import (
     TreeNode,
     TextChunk,
@@ -17,6 +16,7 @@ from app.models import (
 )
 from app.models.context import Context
 from app.logger import get_logger
+from app.openai_client import get_openai_client
 
 logger = get_logger(__name__)
 
@@ -199,7 +199,7 @@ class FormAgent:
     """One-shot streaming agent: TextChunk intro + TextFormChunk."""
 
     def __init__(self, api_key: str, model: str = "gpt-4.1"):
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = get_openai_client(api_key)
         self.model = model
         logger.info(f"FormAgent initialized with model: {model}")
 
@@ -0,0 +1,29 @@
+"""
+Fast JSON encode/decode helpers backed by orjson.
+
+Output is always compact; ``JSONDecodeError`` subclasses the stdlib
+``json.JSONDecodeError`` so existing ``except`` clauses keep working.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse a JSON document from str or bytes."""
+    return orjson.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize an object to a compact JSON string."""
+    return orjson.dumps(obj).decode()
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize an object to compact UTF-8 JSON bytes, skipping the str decode."""
+    return orjson.dumps(obj)
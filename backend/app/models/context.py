@@ -28,6 +28,7 @@ class Context:
         # Persisted trees (set via /submit-tree)
         self.people_tree: Optional[list[TreeNode]] = None
         self.place_tree: Optional[list[TreeNode]] = None
+        self._people_index: Optional[dict[str, dict]] = None
 
         # Persisted form data (label -> content)
         self.form_data: dict[str, str] = {}
@@ -48,6 +49,15 @@ class Context:
             for msg in self.conversation
         ]
 
+    def get_recent_history(self, n: int = 6) -> list[dict]:
+        """Get the last ``n`` messages as dicts for OpenAI API."""
+        if n <= 0:
+            return []
+        return [
+            {"role": msg.role, "content": msg.content}
+            for msg in self.conversation[-n:]
+        ]
+
     # ── Tree persistence ────────────────────────────────────────────────
 
     def save_trees(
@@ -58,6 +68,19 @@ class Context:
         """Persist the submitted trees."""
         self.people_tree = people_tree
         self.place_tree = place_tree
+        self._people_index = None
+
+    def find_people_node(self, label: str) -> Optional[dict]:
+        """Look up a top-level people-tree node (dict form) by label.
+
+        The label index is built lazily and reset by ``save_trees``.
+        """
+        if self._people_index is None:
+            index: dict[str, dict] = {}
+            for node in self.people_tree or []:
+                index.setdefault(node["label"], node)
+            self._people_index = index
+        return self._people_index.get(label)
 
     # ── Form persistence ────────────────────────────────────────────────
 
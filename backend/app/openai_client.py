@@ -0,0 +1,59 @@
+"""
+Shared AsyncOpenAI clients.
+
+All agents reuse one pooled HTTP/2 connection pool (HTTP/1.1 when h2 is
+missing) so keep-alive and TLS sessions are shared across concurrent requests.
+"""
+
+from __future__ import annotations
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+    logger.warning("h2 not installed; OpenAI client falls back to HTTP/1.1")
+
+_http_client: httpx.AsyncClient | None = None
+_clients: dict[str, AsyncOpenAI] = {}
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = DefaultAsyncHttpxClient(
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+            ),
+        )
+    return _http_client
+
+
+def get_openai_client(api_key: str) -> AsyncOpenAI:
+    """Return the shared client for an API key, creating it on first use."""
+    client = _clients.get(api_key)
+    if client is None:
+        client = AsyncOpenAI(api_key=api_key, http_client=_get_http_client())
+        _clients[api_key] = client
+        logger.info("Shared OpenAI client created")
+    return client
+
+
+async def close_openai_clients() -> None:
+    """Close the shared connection pool (call at app shutdown)."""
+    global _http_client
+    _clients.clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("Shared OpenAI HTTP client closed")
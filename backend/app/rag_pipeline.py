@@ -3,6 +3,9 @@ from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 from typing import List, Dict, BinaryIO
 import os
+import threading
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
 from app.logger import get_logger
 import PyPDF2
@@ -14,9 +17,15 @@ logger = get_logger(__name__)
 class RAGPipeline:
     """RAG pipeline for document retrieval and embedding"""
     
+    # Number of query embeddings kept in memory for reuse
+    EMBEDDING_CACHE_SIZE = 2048
+    
     def __init__(self, collection_name: str = "documents"):
         logger.info("Initializing RAG pipeline...")
         
+        self._embedding_cache: OrderedDict = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        
         # Initialize embedding model
         logger.info("Loading embedding model: all-MiniLM-L6-v2")
         self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
@@ -35,6 +44,9 @@ class RAGPipeline:
             metadata={"hnsw:space": "cosine"}
         )
         
+        # Bumped on every write so callers can invalidate cached results
+        self.version = 0
+        
         # Check existing documents
         existing_count = self.collection.count()
         logger.info(f"ChromaDB collection '{collection_name}' initialized with {existing_count} existing chunks")
@@ -92,10 +104,56 @@ class RAGPipeline:
             metadatas=[metadata],
             ids=[doc_id]
         )
+        self.version += 1
         total = self.collection.count()
         logger.debug(f"Added 1 chunk (id={doc_id}). Total in DB: {total}")
         return 1
 
+    def ingest_texts(
+        self,
+        texts: List[str],
+        doc_ids: List[str],
+        metadatas: List[Dict],
+        batch_size: int = 128,
+    ) -> int:
+        """Ingest many single-chunk texts, embedding and adding them in batches.
+
+        Empty texts are skipped; a doc_id repeated within the call keeps its
+        first occurrence. Returns the number of texts added.
+        """
+        seen = set()
+        batch_texts, batch_ids, batch_metas = [], [], []
+        for text, doc_id, metadata in zip(texts, doc_ids, metadatas):
+            if not (text and text.strip()):
+                logger.warning(f"Skipping empty text (id={doc_id})")
+                continue
+            if doc_id in seen:
+                logger.warning(f"Skipping duplicate id: {doc_id}")
+                continue
+            seen.add(doc_id)
+            batch_texts.append(text)
+            batch_ids.append(doc_id)
+            batch_metas.append(metadata or {})
+        
+        for start in range(0, len(batch_texts), batch_size):
+            end = start + batch_size
+            embeddings = self.embedding_model.encode(
+                batch_texts[start:end],
+                batch_size=batch_size,
+                show_progress_bar=False,
+            ).tolist()
+            self.collection.add(
+                embeddings=embeddings,
+                documents=batch_texts[start:end],
+                metadatas=batch_metas[start:end],
+                ids=batch_ids[start:end],
+            )
+        
+        if batch_texts:
+            self.version += 1
+        logger.debug(f"Added {len(batch_texts)} chunks. Total in DB: {self.collection.count()}")
+        return len(batch_texts)
+
     def ingest_document(self, filepath: str, metadata: Dict = None):
         """Ingest a document into the vector store"""
         logger.info(f"Ingesting document: {filepath}")
@@ -137,6 +195,7 @@ class RAGPipeline:
             metadatas=metadatas,
             ids=ids
         )
+        self.version += 1
         
         total_docs = self.collection.count()
         logger.info(f"Successfully ingested {len(chunks)} chunks from {doc_name}. Total chunks in DB: {total_docs}")
@@ -185,7 +244,8 @@ class RAGPipeline:
         logger.info(f"Directory ingestion complete: {count} total chunks")
         return count
     
-    def search(self, query: str, n_results: int = 3, where: Dict = None) -> List[Dict]:
+    def search(self, query: str, n_results: int = 3, where: Dict = None,
+               min_score: float = None) -> List[Dict]:
         """
         Search for relevant chunks with optional metadata filtering.
         
@@ -194,12 +254,30 @@ class RAGPipeline:
             n_results: Number of results to return
             where: Optional ChromaDB where clause for metadata filtering
                    Example: {"delivery_estimate": {"$lte": 1}}
+            min_score: Optional similarity threshold; only results scoring
+                       strictly above it are returned
         
         Returns:
             List of dicts with content, metadata, and score
         """
         logger.debug(f"Searching for: '{query}' (n_results={n_results}, where={where})")
+        return self.search_by_vector(self.embed([query])[0], n_results=n_results, where=where,
+                                     min_score=min_score)
+    
+    def search_by_vector(self, embedding: List[float], n_results: int = 3, where: Dict = None,
+                         min_score: float = None) -> List[Dict]:
+        """
+        Search with a precomputed query embedding (see embed).
         
+        Args:
+            embedding: Query embedding vector
+            n_results: Number of results to return
+            where: Optional ChromaDB where clause for metadata filtering
+            min_score: Optional similarity threshold (see search)
+        
+        Returns:
+            List of dicts with content, metadata, and score
+        """
         # Check if collection has documents
         doc_count = self.collection.count()
         if doc_count == 0:
@@ -208,12 +286,9 @@ class RAGPipeline:
         
         logger.debug(f"Collection has {doc_count} chunks")
         
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query]).tolist()
-        
         # Search in collection with optional filtering
         query_params = {
-            "query_embeddings": query_embedding,
+            "query_embeddings": [embedding],
             "n_results": min(n_results, doc_count)
         }
         
@@ -224,20 +299,122 @@ class RAGPipeline:
         results = self.collection.query(**query_params)
         
         # Format results
-        formatted_results = []
-        if results['documents'] and len(results['documents'][0]) > 0:
-            for i in range(len(results['documents'][0])):
-                formatted_results.append({
-                    "content": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i],
-                    "score": 1 - results['distances'][0][i]
-                })
+        formatted_results = self._format_row(results, 0, min_score)
         
         logger.info(f"Search returned {len(formatted_results)} results")
         logger.debug(f"Top result score: {formatted_results[0]['score']:.4f}" if formatted_results else "No results")
         
         return formatted_results
     
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts with the pipeline's model.
+        
+        Vectors are cached per text, so a query embedded by one tool is
+        reused by the next; all cache misses share one forward pass.
+        """
+        texts = list(texts)
+        embeddings = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        
+        with self._embedding_cache_lock:
+            for i, text in enumerate(texts):
+                cached = self._embedding_cache.get(text)
+                if cached is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._embedding_cache.move_to_end(text)
+                    embeddings[i] = cached
+        
+        if missing:
+            new_texts = list(missing)
+            vectors = self.embedding_model.encode(new_texts).tolist()
+            with self._embedding_cache_lock:
+                for text, vector in zip(new_texts, vectors):
+                    for i in missing[text]:
+                        embeddings[i] = vector
+                    self._embedding_cache[text] = vector
+                while len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
+            logger.debug(f"Embedded {len(new_texts)} texts ({len(texts) - sum(map(len, missing.values()))} cached)")
+        
+        return embeddings
+    
+    def search_batch(self, queries: List[str], n_results: int = 3, where: Dict = None,
+                     query_embeddings: List[List[float]] = None,
+                     min_score: float = None) -> List[List[Dict]]:
+        """
+        Search for several queries at once.
+        
+        All queries are embedded in one forward pass and sent to ChromaDB
+        as a single multi-query request.
+        
+        Args:
+            queries: Search query strings
+            n_results: Number of results to return per query
+            where: Optional ChromaDB where clause applied to every query
+            query_embeddings: Precomputed embeddings from embed(), skips encoding
+            min_score: Optional similarity threshold (see search)
+        
+        Returns:
+            One result list per query, in input order (same format as search)
+        """
+        if not queries:
+            return []
+        
+        logger.debug(f"Batch searching {len(queries)} queries (n_results={n_results}, where={where})")
+        
+        doc_count = self.collection.count()
+        if doc_count == 0:
+            logger.warning("No documents in collection")
+            return [[] for _ in queries]
+        
+        if query_embeddings is None:
+            query_embeddings = self.embed(queries)
+        
+        query_params = {
+            "query_embeddings": query_embeddings,
+            "n_results": min(n_results, doc_count)
+        }
+        
+        if where:
+            query_params["where"] = where
+            logger.debug(f"Applying filter: {where}")
+        
+        results = self.collection.query(**query_params)
+        
+        formatted = [self._format_row(results, row, min_score) for row in range(len(queries))]
+        logger.info(f"Batch search returned {sum(len(r) for r in formatted)} results for {len(queries)} queries")
+        return formatted
+    
+    @staticmethod
+    def _format_row(results: Dict, row: int, min_score: float = None) -> List[Dict]:
+        """
+        Convert one query row of a ChromaDB result into result dicts.
+        
+        ChromaDB has no similarity cut-off, so min_score is applied here,
+        before any result dicts are built. Rows come back nearest-first, so
+        the scan stops at the first result at or below min_score.
+        """
+        documents = results['documents']
+        if not documents or row >= len(documents):
+            return []
+        distances = results['distances'][row]
+        end = len(distances)
+        if min_score is not None:
+            end = next((i for i, distance in enumerate(distances) if 1 - distance <= min_score), end)
+        return [
+            {
+                "content": document,
+                "metadata": metadata,
+                "score": 1 - distance
+            }
+            for document, metadata, distance in islice(
+                zip(documents[row], results['metadatas'][row], distances),
+                end,
+            )
+        ]
+    
     def list_documents(self) -> List[Dict]:
         """List all documents in the collection"""
         results = self.collection.get()
@@ -271,6 +448,7 @@ class RAGPipeline:
         
         if ids_to_delete:
             self.collection.delete(ids=ids_to_delete)
+            self.version += 1
             logger.info(f"Deleted {len(ids_to_delete)} chunks from {filename}")
         
         return len(ids_to_delete)
@@ -283,4 +461,5 @@ class RAGPipeline:
             name=self.collection.name,
             metadata={"hnsw:space": "cosine"}
         )
+        self.version += 1
         logger.info("Collection cleared")
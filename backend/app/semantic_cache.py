@@ -0,0 +1,95 @@
+"""
+Embedding-similarity cache for retrieval results.
+
+Lookups match on cosine similarity of the query embedding rather than the
+exact query string, so paraphrases and spelling variants ("banana smoothie"
+vs "Banana Smoothie ") share one cached entry.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SemanticCache:
+    """Bounded LRU cache keyed by unit-normalized embedding vectors.
+
+    Entries older than ``ttl`` seconds (if set) are ignored by ``get`` and
+    left for LRU eviction.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 4096,
+        ttl: Optional[float] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._embeddings: Optional[np.ndarray] = None
+        self._values: list[Any] = []
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._stored_at = np.zeros(max_entries, dtype=np.float64)
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, embedding) -> Optional[Any]:
+        """Return the value of the most similar entry above the threshold."""
+        query = self._normalize(embedding)
+        with self._lock:
+            size = len(self._values)
+            if not size:
+                return None
+            similarities = self._embeddings[:size] @ query
+            if self.ttl is not None:
+                expired = time.monotonic() - self._stored_at[:size] > self.ttl
+                similarities[expired] = -np.inf
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            self._clock += 1
+            self._last_used[best] = self._clock
+            return self._values[best]
+
+    def put(self, embedding, value: Any) -> None:
+        """Insert an entry, evicting the least recently used one when full."""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.empty((self.max_entries, vector.shape[0]), dtype=np.float32)
+            size = len(self._values)
+            if size < self.max_entries:
+                slot = size
+                self._values.append(value)
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._values[slot] = value
+            self._embeddings[slot] = vector
+            self._stored_at[slot] = time.monotonic()
+            self._clock += 1
+            self._last_used[slot] = self._clock
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._last_used[:] = 0
+            self._stored_at[:] = 0
+            logger.debug("Semantic cache cleared")
@@ -6,14 +6,16 @@ Streams TextChunk reasoning; returns ShoppingList internally (not to user).
 
 from __future__ import annotations
 
-import json
+import asyncio
 import re
 from typing import AsyncGenerator
 from openai import AsyncOpenAI
 
+from app import json_utils
 from app.logger import get_logger
 from app.models import TreeNode, TextChunk, ErrorOutput
 from app.models.context import Context
+from app.openai_client import get_openai_client
 from app.tools import tools
 from app.tools.implementations import get_price_range
 logger = get_logger(__name__)
@@ -149,14 +151,19 @@ _QUANTITY_SUFFIX_RE = re.compile(
 
 
 def _strip_quantity_from_item(item: str) -> tuple[str, int | None]:
-    match = _QUANTITY_SUFFIX_RE.search(item)
-    if not match:
+    quantities: list[int] = []
+
+    def _capture(match: re.Match) -> str:
+        quantities.append(int(match.group(1)))
+        return ""
+
+    # Single pass: remove every quantity suffix, keep the first quantity
+    cleaned, count = _QUANTITY_SUFFIX_RE.subn(_capture, item)
+    if not count:
         return item.strip(), None
-    qty = int(match.group(1))
-    cleaned = _QUANTITY_SUFFIX_RE.sub("", item).strip()
     # Remove dangling separators like "-" or ":" at end
-    cleaned = cleaned.rstrip("-:").strip()
-    return cleaned, qty
+    cleaned = cleaned.strip().rstrip("-:").strip()
+    return cleaned, quantities[0]
 
 def get_unique_item_names(rag_pipeline=None) -> list[str]:
     """
@@ -240,10 +247,37 @@ def _format_form_data(form_data: dict[str, str]) -> str:
     return "\n".join(lines) if lines else "(no form data)"
 
 
-def _parse_price_range(raw: str) -> list[dict]:
+def _context_message(
+    people_tree: list[TreeNode] | None,
+    place_tree: list[TreeNode] | None,
+    form_data: dict[str, str] | None,
+) -> dict:
+    """Build the shared event-context block sent first in every LLM call.
+
+    Keeping it byte-identical and at the start of the prompt lets the
+    provider's prefix cache reuse it across the list, quantity and
+    reasoning calls.
+    """
+    tree_text = _trees_to_text(
+        _prune_selected(people_tree),
+        _prune_selected(place_tree),
+    )
+    form_text = _format_form_data(form_data or {})
+    return {
+        "role": "system",
+        "content": (
+            "Selected tree nodes:\n"
+            f"{tree_text}\n\n"
+            "Form data:\n"
+            f"{form_text}"
+        ),
+    }
+
+
+def _parse_price_range(raw: str | bytes) -> list[dict]:
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError:
+        data = json_utils.loads(raw)
+    except json_utils.JSONDecodeError:
         return []
     if not isinstance(data, dict):
         return []
@@ -252,8 +286,8 @@ def _parse_price_range(raw: str) -> list[dict]:
 
 def _parse_quantities(raw: str) -> dict[str, int]:
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError:
+        data = json_utils.loads(raw)
+    except json_utils.JSONDecodeError:
         return {}
     if not isinstance(data, dict):
         return {}
@@ -276,8 +310,13 @@ def _parse_quantities(raw: str) -> dict[str, int]:
 class ShoppingListAgent:
     """Generates a shopping list and streams reasoning text."""
 
-    def __init__(self, api_key: str, model: str = "gpt-4.1"):
-        self.client = AsyncOpenAI(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4.1",
+        client: AsyncOpenAI | None = None,
+    ):
+        self.client = client or get_openai_client(api_key)
         self.model = model
         logger.info(f"ShoppingListAgent initialized with model: {model}")
 
@@ -289,24 +328,18 @@ class ShoppingListAgent:
         form_data: dict[str, str] | None,
     ) -> tuple[list[str], list[dict], dict[str, int]]:
         """Create a shopping list, fetch price ranges, and propose quantities."""
-        pruned_people = _prune_selected(people_tree)
-        pruned_place = _prune_selected(place_tree)
-        tree_text = _trees_to_text(pruned_people, pruned_place)
-        form_text = _format_form_data(form_data or {})
-        available_items = get_unique_item_names()
+        context_message = _context_message(people_tree, place_tree, form_data)
+        available_items = await asyncio.to_thread(get_unique_item_names)
 
         messages = [
+            context_message,
             {"role": "system", "content": _SYSTEM_PROMPT_LIST},
-            *context.get_conversation_history(),
+            *context.get_recent_history(),
             {
                 "role": "user",
                 "content": (
-                    "Selected tree nodes:\n"
-                    f"{tree_text}\n\n"
-                    "Form data:\n"
-                    f"{form_text}\n\n"
                     "Available inventory items (choose only from this list):\n"
-                    f"{json.dumps(available_items, indent=2)}\n\n"
+                    f"{json_utils.dumps(available_items)}\n\n"
                     "Generate the shopping list now."
                 ),
             },
@@ -326,7 +359,7 @@ class ShoppingListAgent:
             for call in tool_calls:
                 if call.function.name != "emit_items":
                     continue
-                args = json.loads(call.function.arguments or "{}")
+                args = json_utils.loads(call.function.arguments or "{}")
                 raw_items = args.get("items", [])
                 if isinstance(raw_items, list):
                     cleaned_items: list[str] = []
@@ -345,10 +378,7 @@ class ShoppingListAgent:
         price_ranges: list[dict] = []
         if items:
             try:
-                raw = get_price_range(
-                    json.dumps(items),
-                    registry=tools,
-                )
+                raw = await get_price_range(items, registry=tools)
                 price_ranges = _parse_price_range(raw)
             except Exception as e:
                 logger.warning(
@@ -362,17 +392,14 @@ class ShoppingListAgent:
                 response = await self.client.chat.completions.create(
                     model=self.model,
                     messages=[
+                        context_message,
                         {"role": "system", "content": _SYSTEM_PROMPT_QUANTITIES},
-                        *context.get_conversation_history(),
+                        *context.get_recent_history(),
                         {
                             "role": "user",
                             "content": (
-                                "Selected tree nodes:\n"
-                                f"{tree_text}\n\n"
-                                "Form data:\n"
-                                f"{form_text}\n\n"
                                 "Shopping list items:\n"
-                                f"{json.dumps(items, indent=2)}\n\n"
+                                f"{json_utils.dumps(items)}\n\n"
                                 "Provide quantities."
                             ),
                         },
@@ -408,25 +435,18 @@ class ShoppingListAgent:
         form_data: dict[str, str] | None,
     ) -> AsyncGenerator[str, None]:
         """Stream TextChunk reasoning about the shopping list."""
-        pruned_people = _prune_selected(people_tree)
-        pruned_place = _prune_selected(place_tree)
-        tree_text = _trees_to_text(pruned_people, pruned_place)
-        form_text = _format_form_data(form_data or {})
-        price_text = json.dumps(price_ranges, indent=2) if price_ranges else "None"
-        quantity_text = json.dumps(quantities, indent=2) if quantities else "None"
+        price_text = json_utils.dumps(price_ranges) if price_ranges else "None"
+        quantity_text = json_utils.dumps(quantities) if quantities else "None"
 
         messages = [
+            _context_message(people_tree, place_tree, form_data),
             {"role": "system", "content": _SYSTEM_PROMPT_REASONING},
-            *context.get_conversation_history(),
+            *context.get_recent_history(),
             {
                 "role": "user",
                 "content": (
-                    "Selected tree nodes:\n"
-                    f"{tree_text}\n\n"
-                    "Form data:\n"
-                    f"{form_text}\n\n"
                     "Shopping list items:\n"
-                    f"{json.dumps(items, indent=2)}\n\n"
+                    f"{json_utils.dumps(items)}\n\n"
                     "Price range data:\n"
                     f"{price_text}\n\n"
                     "Quantity suggestions:\n"
@@ -480,11 +500,11 @@ class ShoppingListAgent:
                     if tc["name"] != "emit_text":
                         continue
                     try:
-                        args = json.loads(tc["arguments"])
+                        args = json_utils.loads(tc["arguments"])
                         content = str(args.get("content", "")).strip()
                         if content:
                             yield TextChunk(content=content).model_dump_json()
-                    except json.JSONDecodeError:
+                    except json_utils.JSONDecodeError:
                         yield ErrorOutput(
                             message="Failed to parse reasoning",
                             code="SHOPPING_LIST_PARSE_ERROR",
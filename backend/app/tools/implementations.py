@@ -4,13 +4,25 @@ Tool implementations.
 Add new tools here and register them with the @tools.register decorator.
 """
 
-import json
+import ast
+import asyncio
+import functools
+import operator
 import re
 import hashlib
+import heapq
+import json
+import math
 import random
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional, Union
 from dataclasses import dataclass
+import numpy as np
+from app import json_utils
+from app.semantic_cache import SemanticCache
 from app.tools.registry import ToolRegistry
 from app.logger import get_logger
 
@@ -19,8 +31,14 @@ logger = get_logger(__name__)
 # Global registry instance
 tools = ToolRegistry()
 
+# Static error payloads, encoded once
+_ERR_NO_RAG = json_utils.dumps_bytes({
+    "success": False,
+    "error": "RAG pipeline not initialized"
+})
 
-@dataclass
+
+@dataclass(frozen=True)
 class FilterRange:
     """Represents a range filter with optional min and max values."""
     min: Optional[Union[int, float]] = None
@@ -32,7 +50,7 @@ class FilterRange:
             raise ValueError("At least one of 'min' or 'max' must be provided")
 
 
-@dataclass
+@dataclass(frozen=True)
 class Filters:
     """
     Filters for search_database queries.
@@ -109,135 +127,343 @@ class Filters:
                 result["price"] = self.price
         
         return result
+    
+    @classmethod
+    def from_input(cls, value: Optional[Union["Filters", dict]]) -> Optional["Filters"]:
+        """
+        Normalize a Filters object or backward-compatible filters dict.
+        
+        Dict entries with an unrecognized format are logged and skipped;
+        returns None when no usable filter remains.
+        """
+        if value is None or isinstance(value, cls):
+            return value
+        
+        fields = {}
+        for name in ("delivery_time", "price"):
+            if name not in value:
+                continue
+            raw = value[name]
+            if isinstance(raw, (int, float)):
+                fields[name] = raw
+            elif isinstance(raw, dict) and (
+                raw.get("min") is not None or raw.get("max") is not None
+            ):
+                fields[name] = FilterRange(min=raw.get("min"), max=raw.get("max"))
+            else:
+                logger.warning("Invalid %s filter format: %s", name, raw)
+        
+        return cls(**fields) if fields else None
+
+
+# Semantic caches per (tool, search parameters), dropped whenever the
+# pipeline's collection changes. Ingests from another process (e.g.
+# ingest_items_csv.py) don't bump the version, so entries also expire.
+_SEMANTIC_CACHE_TTL = 300.0
+_semantic_caches: dict[tuple, SemanticCache] = {}
+_semantic_caches_version = None
+_semantic_caches_lock = threading.Lock()
+
+
+def _semantic_cache_for(rag_pipeline, key: tuple) -> SemanticCache:
+    """Return the semantic cache for ``key``, resetting all caches on ingest."""
+    global _semantic_caches_version
+    version = (id(rag_pipeline), rag_pipeline.version)
+    with _semantic_caches_lock:
+        if version != _semantic_caches_version:
+            _semantic_caches.clear()
+            _semantic_caches_version = version
+        cache = _semantic_caches.get(key)
+        if cache is None:
+            cache = _semantic_caches[key] = SemanticCache(ttl=_SEMANTIC_CACHE_TTL)
+        return cache
 
 
 @tools.register
-def get_rag_chunks(query: str, n_results: int = 3, registry: ToolRegistry = None) -> str:
+async def get_rag_chunks(query: str, n_results: int = 3, registry: ToolRegistry = None) -> bytes:
     """Retrieve relevant document chunks based on a query using RAG."""
-    logger.info(f"get_rag_chunks called: query='{query}', n_results={n_results}")
+    # Embedding and the Chroma query block, so keep them off the event loop
+    return await asyncio.to_thread(_get_rag_chunks, query, n_results, registry)
+
+
+def _get_rag_chunks(query: str, n_results: int, registry: Optional[ToolRegistry]) -> bytes:
+    logger.info("get_rag_chunks called: query=%r, n_results=%s", query, n_results)
 
     if not registry or not registry.rag_pipeline:
         logger.error("RAG pipeline not initialized")
-        return json.dumps({
-            "success": False,
-            "error": "RAG pipeline not initialized"
-        })
+        return _ERR_NO_RAG
 
     try:
-        results = registry.rag_pipeline.search(query, n_results)
-        logger.info(f"RAG search successful: {len(results)} chunks found")
-        return json.dumps({
+        rag_pipeline = registry.rag_pipeline
+        embedding = rag_pipeline.embed([query])
+        cache = _semantic_cache_for(rag_pipeline, ("chunks", n_results))
+        results = cache.get(embedding[0])
+        if results is None:
+            results = rag_pipeline.search_batch([query], n_results, query_embeddings=embedding)[0]
+            cache.put(embedding[0], results)
+        else:
+            logger.debug("Semantic cache hit for query %r", query)
+        logger.info("RAG search successful: %d chunks found", len(results))
+        return json_utils.dumps_bytes({
             "success": True,
             "chunks": results,
             "count": len(results)
-        }, indent=2)
+        })
     except Exception as e:
-        logger.error(f"RAG search failed: {e}", exc_info=True)
-        return json.dumps({
+        logger.error("RAG search failed: %s", e, exc_info=True)
+        return json_utils.dumps_bytes({
             "success": False,
             "error": str(e)
         })
 
 
-@tools.register
-def get_current_weather(location: str) -> str:
-    """Get current weather for a location."""
-    logger.info(f"get_current_weather called: location='{location}'")
-    return json.dumps({
+@functools.lru_cache(maxsize=256)
+def _weather_body(location: str) -> str:
+    """Encoded weather payload for a location, open-ended before the timestamp."""
+    return json_utils.dumps({
         "location": location,
         "temperature": 22,
         "condition": "Sunny",
-        "humidity": 65,
-        "timestamp": datetime.now().isoformat()
-    })
+        "humidity": 65
+    })[:-1]
+
+
+@tools.register
+def get_current_weather(location: str) -> str:
+    """Get current weather for a location."""
+    logger.info("get_current_weather called: location=%r", location)
+    return f'{_weather_body(location)},"timestamp":"{datetime.now().isoformat()}"}}'
+
+
+_CALC_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_CALC_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_CALC_FUNCTIONS = {"abs": abs, "round": round, "min": min, "max": max}
+_CALC_MAX_EXPRESSION_LENGTH = 256
+_CALC_MAX_EXPONENT = 1000
+_CALC_MAX_INT_BITS = 4096
+
+
+class _CalcEvaluator(ast.NodeVisitor):
+    """Evaluate an arithmetic expression tree over a whitelist of node types."""
+
+    def visit_Expression(self, node: ast.Expression):
+        return self.visit(node.body)
+
+    def visit_Constant(self, node: ast.Constant):
+        if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return node.value
+        raise ValueError(f"Unsupported constant: {node.value!r}")
+
+    def visit_BinOp(self, node: ast.BinOp):
+        op = _CALC_BIN_OPS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if op is operator.pow:
+            _check_power(left, right)
+        return op(left, right)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp):
+        op = _CALC_UNARY_OPS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        return op(self.visit(node.operand))
+
+    def visit_Call(self, node: ast.Call):
+        if (
+            not isinstance(node.func, ast.Name)
+            or node.func.id not in _CALC_FUNCTIONS
+            or node.keywords
+        ):
+            raise ValueError("Only abs, round, min and max calls are allowed")
+        args = [self.visit(arg) for arg in node.args]
+        return _CALC_FUNCTIONS[node.func.id](*args)
+
+    def visit_List(self, node: ast.List):
+        return [self.visit(elt) for elt in node.elts]
+
+    def visit_Tuple(self, node: ast.Tuple):
+        return tuple(self.visit(elt) for elt in node.elts)
+
+    def generic_visit(self, node: ast.AST):
+        raise ValueError(f"Unsupported expression: {type(node).__name__}")
+
+
+def _check_power(base, exponent) -> None:
+    """Reject powers whose result would be unreasonably large to compute."""
+    if not isinstance(exponent, (int, float)) or abs(exponent) > _CALC_MAX_EXPONENT:
+        raise ValueError(f"Exponent too large: {exponent!r}")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if base.bit_length() * exponent > _CALC_MAX_INT_BITS:
+            raise ValueError("Result too large")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_expression(expression: str) -> ast.Expression:
+    return ast.parse(expression, mode="eval")
+
+
+def _check_finite(value) -> None:
+    """Reject results that overflowed to inf or became nan."""
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            _check_finite(item)
+    elif isinstance(value, float) and not math.isfinite(value):
+        raise ValueError("Result is not a finite number")
+
+
+def _safe_eval(expression: str):
+    """Evaluate an arithmetic expression without eval()."""
+    if len(expression) > _CALC_MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression longer than {_CALC_MAX_EXPRESSION_LENGTH} characters")
+    result = _CalcEvaluator().visit(_parse_expression(expression))
+    _check_finite(result)
+    return result
 
 
 @tools.register
 def calculate(expression: str) -> str:
     """Evaluate a mathematical expression."""
-    logger.info(f"calculate called: expression='{expression}'")
+    logger.info("calculate called: expression=%r", expression)
     try:
-        allowed_names = {"abs": abs, "round": round, "min": min, "max": max}
-        result = eval(expression, {"__builtins__": {}}, allowed_names)
-        logger.info(f"Calculation result: {result}")
+        result = _safe_eval(expression)
+        logger.info("Calculation result: %s", result)
+        # stdlib json: orjson rejects integers wider than 64 bits
         return json.dumps({
             "expression": expression,
             "result": result
         })
     except Exception as e:
-        logger.error(f"Calculation error: {e}")
-        return json.dumps({
+        logger.error("Calculation error: %s", e)
+        return json_utils.dumps({
             "error": f"Invalid expression: {str(e)}"
         })
 
 
+_rng_local = threading.local()
+
+
 def _stable_rng(seed_text: str) -> random.Random:
-    digest = hashlib.sha256(seed_text.encode("utf-8")).hexdigest()
-    seed_int = int(digest[:16], 16)
-    return random.Random(seed_int)
+    """
+    Return this thread's Random, reseeded deterministically from seed_text.
+    
+    The instance is reused, so it is only valid until the next call on the
+    same thread.
+    """
+    # Only needs to be deterministic, not cryptographic: an 8-byte blake2b
+    # digest is cheaper than sha256 and needs no hex round-trip.
+    digest = hashlib.blake2b(seed_text.encode("utf-8"), digest_size=8).digest()
+    rng = getattr(_rng_local, "rng", None)
+    if rng is None:
+        rng = _rng_local.rng = random.Random()
+    rng.seed(int.from_bytes(digest, "big"))
+    return rng
+
+
+# Keyword -> label, in priority order: the earliest entry found anywhere in
+# the context wins, regardless of where it appears in the text.
+_EVENT_KEYWORDS = {
+    "wedding": "wedding",
+    "birthday": "birthday party",
+    "conference": "conference",
+    "meetup": "meetup",
+    "office": "office event",
+    "corporate": "corporate event",
+    "festival": "festival",
+    "sports": "sports event",
+    "kids": "kids event",
+    "school": "school event",
+    "outdoor": "outdoor event",
+}
+_EVENT_PRIORITY = {key: rank for rank, key in enumerate(_EVENT_KEYWORDS)}
+# Zero-width lookahead so overlapping keywords are all seen in one pass
+_EVENT_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, _EVENT_KEYWORDS)) + "))",
+    re.IGNORECASE,
+)
+_LOCATION_RE = re.compile(r"address:\s*([^.\n]+)", re.IGNORECASE)
 
 
 def _extract_event_type(event_context: str) -> str:
-    lower = event_context.lower()
-    keywords = {
-        "wedding": "wedding",
-        "birthday": "birthday party",
-        "conference": "conference",
-        "meetup": "meetup",
-        "office": "office event",
-        "corporate": "corporate event",
-        "festival": "festival",
-        "sports": "sports event",
-        "kids": "kids event",
-        "school": "school event",
-        "outdoor": "outdoor event",
-    }
-    for key, label in keywords.items():
-        if key in lower:
-            return label
-    return "community event"
+    best = None
+    for match in _EVENT_RE.finditer(event_context):
+        key = match.group(1).lower()
+        if best is None or _EVENT_PRIORITY[key] < _EVENT_PRIORITY[best]:
+            best = key
+            if _EVENT_PRIORITY[key] == 0:
+                break
+    return _EVENT_KEYWORDS[best] if best is not None else "community event"
 
 
 def _extract_location(event_context: str) -> str:
-    match = re.search(r"address:\s*([^.\n]+)", event_context, re.IGNORECASE)
+    match = _LOCATION_RE.search(event_context)
     if match:
         return match.group(1).strip()
     return "the venue"
 
 
+# Sponsorship reason templates; only the one picked is formatted
+_APPROVE_REASONS = (
+    "We can support the {event_type} in {location} with a targeted promo.",
+    "This {event_type} in {location} aligns with our local outreach goals.",
+    "Seasonal demand in {location} makes this {event_type} a good fit.",
+    "Our regional marketing plan includes events like this {event_type} in {location}.",
+    "Partnering on this {event_type} in {location} fits our community engagement focus.",
+    "Projected attendance in {location} makes this {event_type} a strong match.",
+    "This {event_type} helps us showcase new inventory in {location}.",
+)
+_REJECT_REASONS = (
+    "Our local budget for {location} is already allocated this month.",
+    "Inventory constraints in {location} limit support for this {event_type}.",
+    "We cannot sponsor this {event_type} due to delivery capacity in {location}.",
+    "Compliance limits prevent sponsorships for this {event_type} in {location}.",
+    "Current vendor commitments in {location} restrict additional sponsorships.",
+    "The event timing in {location} overlaps with an internal campaign freeze.",
+    "We are prioritizing different categories for {event_type} in {location}.",
+)
+_PERCENT_STEPS = tuple(range(5, 55, 5))
+
+
 @tools.register
 def check_retailer_sponsorship(
     retailer: str,
     items: str,
     event_context: str
-) -> str:
+) -> bytes:
     """
     Mock retailer sponsorship check with deterministic, realistic reasoning.
     """
     try:
-        parsed_items = json.loads(items)
+        parsed_items = json_utils.loads(items)
         if not isinstance(parsed_items, list):
             parsed_items = [parsed_items]
-    except (json.JSONDecodeError, TypeError):
+    except (json_utils.JSONDecodeError, TypeError):
         parsed_items = [items]
 
-    normalized_items: list[dict] = []
+    # Item names and ids as parallel lists
+    names: list[str] = []
+    ids: list = []
     for entry in parsed_items:
         if isinstance(entry, dict):
             name = str(entry.get("item", "")).strip()
-            if name:
-                normalized_items.append(
-                    {
-                        "item": name,
-                        "id": entry.get("id"),
-                    }
-                )
+            item_id = entry.get("id")
         else:
             name = str(entry).strip()
-            if name:
-                normalized_items.append({"item": name, "id": None})
+            item_id = None
+        if name:
+            names.append(name)
+            ids.append(item_id)
 
-    seed_text = f"{retailer}|{json.dumps(normalized_items)}|{event_context}"
+    seed_text = f"{retailer}|{items}|{event_context}"
     rng = _stable_rng(seed_text)
 
     event_type = _extract_event_type(event_context)
@@ -245,119 +471,83 @@ def check_retailer_sponsorship(
 
     approved = rng.random() > 0.35
 
-    approve_reasons = [
-        f"We can support the {event_type} in {location} with a targeted promo.",
-        f"This {event_type} in {location} aligns with our local outreach goals.",
-        f"Seasonal demand in {location} makes this {event_type} a good fit.",
-        f"Our regional marketing plan includes events like this {event_type} in {location}.",
-        f"Partnering on this {event_type} in {location} fits our community engagement focus.",
-        f"Projected attendance in {location} makes this {event_type} a strong match.",
-        f"This {event_type} helps us showcase new inventory in {location}.",
-    ]
-    reject_reasons = [
-        f"Our local budget for {location} is already allocated this month.",
-        f"Inventory constraints in {location} limit support for this {event_type}.",
-        f"We cannot sponsor this {event_type} due to delivery capacity in {location}.",
-        f"Compliance limits prevent sponsorships for this {event_type} in {location}.",
-        f"Current vendor commitments in {location} restrict additional sponsorships.",
-        f"The event timing in {location} overlaps with an internal campaign freeze.",
-        f"We are prioritizing different categories for {event_type} in {location}.",
-    ]
-
     if not approved:
-        return json.dumps({
+        return json_utils.dumps_bytes({
             "retailer": retailer,
             "status": "rejected",
-            "reason": rng.choice(reject_reasons),
+            "reason": rng.choice(_REJECT_REASONS).format(event_type=event_type, location=location),
             "discountedItems": []
         })
 
-    if not normalized_items:
-        normalized_items = [{"item": "general supplies", "id": None}]
+    if not names:
+        names = ["general supplies"]
+        ids = [None]
 
-    percent_steps = list(range(5, 55, 5))
-    target_count = max(1, int(round(len(normalized_items) * 0.2)))
-    target_count = min(target_count, len(normalized_items))
-    discounted_selection = rng.sample(normalized_items, k=target_count)
-    discounted_names = {entry["item"] for entry in discounted_selection}
+    count = len(names)
+    target_count = max(1, int(round(count * 0.2)))
+    target_count = min(target_count, count)
+    discounted_names = {names[i] for i in rng.sample(range(count), k=target_count)}
 
-    discounted_items = []
-    for entry in normalized_items:
-        if entry["item"] in discounted_names:
-            percent = rng.choice(percent_steps)
-        else:
-            percent = 0
-        discounted_items.append({
-            "item": entry["item"],
-            "id": entry.get("id"),
-            "percent": percent
-        })
+    percents = [rng.choice(_PERCENT_STEPS) if name in discounted_names else 0 for name in names]
+    discounted_items = [
+        {"item": name, "id": item_id, "percent": percent}
+        for name, item_id, percent in zip(names, ids, percents)
+    ]
 
-    overall_discount = int(sum(i["percent"] for i in discounted_items) / len(discounted_items))
+    overall_discount = int(sum(percents) / count)
 
-    return json.dumps({
+    return json_utils.dumps_bytes({
         "retailer": retailer,
         "status": "approved",
-        "reason": rng.choice(approve_reasons),
+        "reason": rng.choice(_APPROVE_REASONS).format(event_type=event_type, location=location),
         "discountPercent": overall_discount,
         "discountedItems": discounted_items
     })
 
 
-def _build_where_clause(filters: Optional[Union[Filters, dict]]) -> Optional[dict]:
+@functools.lru_cache(maxsize=256)
+def _build_where_clause(filters: Optional[Filters]) -> Optional[dict]:
     """
-    Build a ChromaDB where clause from Filters object or dict.
+    Build a ChromaDB where clause from a Filters object.
     
     Supports expandable filter types with AND relationship between filters.
+    Results are cached per distinct Filters value, so callers must not mutate
+    the returned dict.
     
     Args:
-        filters: Filters object or dict of filters
+        filters: Filters object (see Filters.from_input for dict input)
     
     Returns:
         ChromaDB where clause dict using $and operator for multiple conditions
     """
-    if not filters:
+    if filters is None:
         return None
     
-    # Convert Filters object to dict for processing
-    if isinstance(filters, Filters):
-        filters_dict = filters.to_dict()
-    else:
-        filters_dict = filters
-    
     conditions = []
     
     # Handle delivery_time filter
-    if "delivery_time" in filters_dict:
-        delivery_filter = filters_dict["delivery_time"]
-        
-        if isinstance(delivery_filter, (int, float)):
-            # Exact match: delivery_time=0
-            conditions.append({"delivery_estimate": {"$eq": int(delivery_filter)}})
-        elif isinstance(delivery_filter, dict):
-            # Range filter: {"max": 1} or {"min": 1, "max": 2}
-            if "max" in delivery_filter:
-                conditions.append({"delivery_estimate": {"$lte": int(delivery_filter["max"])}})
-            if "min" in delivery_filter:
-                conditions.append({"delivery_estimate": {"$gte": int(delivery_filter["min"])}})
-        else:
-            logger.warning(f"Invalid delivery_time filter format: {delivery_filter}")
+    delivery_filter = filters.delivery_time
+    if isinstance(delivery_filter, FilterRange):
+        # Range filter: FilterRange(max=1) or FilterRange(min=1, max=2)
+        if delivery_filter.max is not None:
+            conditions.append({"delivery_estimate": {"$lte": int(delivery_filter.max)}})
+        if delivery_filter.min is not None:
+            conditions.append({"delivery_estimate": {"$gte": int(delivery_filter.min)}})
+    elif delivery_filter is not None:
+        # Exact match: delivery_time=0
+        conditions.append({"delivery_estimate": {"$eq": int(delivery_filter)}})
     
     # Handle price filter
-    if "price" in filters_dict:
-        price_filter = filters_dict["price"]
-        
-        if isinstance(price_filter, (int, float)):
-            # Exact match: price=1.5
-            conditions.append({"price": {"$eq": float(price_filter)}})
-        elif isinstance(price_filter, dict):
-            # Range filter: {"max": 2.0} or {"min": 1.0, "max": 3.0}
-            if "max" in price_filter:
-                conditions.append({"price": {"$lte": float(price_filter["max"])}})
-            if "min" in price_filter:
-                conditions.append({"price": {"$gte": float(price_filter["min"])}})
-        else:
-            logger.warning(f"Invalid price filter format: {price_filter}")
+    price_filter = filters.price
+    if isinstance(price_filter, FilterRange):
+        # Range filter: FilterRange(max=2.0) or FilterRange(min=1.0, max=3.0)
+        if price_filter.max is not None:
+            conditions.append({"price": {"$lte": float(price_filter.max)}})
+        if price_filter.min is not None:
+            conditions.append({"price": {"$gte": float(price_filter.min)}})
+    elif price_filter is not None:
+        # Exact match: price=1.5
+        conditions.append({"price": {"$eq": float(price_filter)}})
     
     # Return None if no valid conditions
     if not conditions:
@@ -371,6 +561,25 @@ def _build_where_clause(filters: Optional[Union[Filters, dict]]) -> Optional[dic
     return {"$and": conditions}
 
 
+def _maybe_parse_json_list(text) -> Optional[list]:
+    """
+    Parse ``text`` as a JSON array, or return None if it is not one.
+    
+    Only strings starting with '[' reach the JSON parser, so plain item
+    names never pay for a raised and caught decode error.
+    """
+    if not isinstance(text, (str, bytes)):
+        return None
+    stripped = text.lstrip()
+    if not stripped.startswith("[" if isinstance(stripped, str) else b"["):
+        return None
+    try:
+        parsed = json_utils.loads(stripped)
+    except json_utils.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+
 def search_database(
     query, 
     similarity_threshold: float = 0.5, 
@@ -445,51 +654,64 @@ def search_database(
         logger.error("RAG pipeline not provided to search_database")
         return []
     
+    # Fast path for the common shape: one plain-text query, no filters.
+    # Skips the JSON parse attempt, where-clause building and result wrapping.
+    if isinstance(query, str) and not filters and not query.lstrip().startswith("["):
+        results = rag_pipeline.search(query, n_results=n_results, min_score=similarity_threshold)
+        return _top_scored(results, top_results)
+    
     # Parse query - could be single string, JSON array, or list
     queries = []
     is_single_query = False
     
     if isinstance(query, str):
-        # Try to parse as JSON array first
-        try:
-            parsed = json.loads(query)
-            if isinstance(parsed, list):
-                queries = parsed
-            else:
-                # Single string that's valid JSON but not a list
-                queries = [query]
-                is_single_query = True
-        except (json.JSONDecodeError, TypeError):
-            # Plain string
+        # JSON array of queries, otherwise a single plain query
+        parsed = _maybe_parse_json_list(query)
+        if parsed is not None:
+            queries = parsed
+        else:
             queries = [query]
             is_single_query = True
     elif isinstance(query, list):
         queries = query
     else:
-        logger.error(f"Invalid query type: {type(query)}")
+        logger.error("Invalid query type: %s", type(query))
         return []
     
-    # Build ChromaDB where clause from filters
+    # Build ChromaDB where clause from filters (dicts are normalized once here)
+    filters = Filters.from_input(filters) if filters else None
     where_clause = _build_where_clause(filters)
     if where_clause:
-        logger.debug(f"Applying filters: {filters} -> where clause: {where_clause}")
-    
-    logger.debug(f"Processing {len(queries)} queries")
+        logger.debug("Applying filters: %s -> where clause: %s", filters, where_clause)
+    
+    logger.debug("Processing %d queries", len(queries))
+    
+    # Search for similar items in vector DB with optional filtering; several
+    # queries share one batched embedding pass and vector DB request
+    if len(queries) > 1:
+        search_rows = rag_pipeline.search_batch(
+            queries,
+            n_results=n_results,
+            where=where_clause,
+            min_score=similarity_threshold
+        )
+    else:
+        search_rows = [
+            rag_pipeline.search(
+                q,
+                n_results=n_results,
+                where=where_clause,
+                min_score=similarity_threshold
+            )
+            for q in queries
+        ]
     
-    # Search for each query
     all_results = []
-    for q in queries:
-        # Search for similar items in vector DB with optional filtering
-        results = rag_pipeline.search(q, n_results=n_results, where=where_clause)
-        logger.debug(f"Found {len(results)} results from vector DB for '{q}'")
+    for q, results in zip(queries, search_rows):
+        logger.debug("Found %d results from vector DB for %r", len(results), q)
         
-        # Filter by similarity threshold
-        similar_items = [r for r in results if r.get("score", 0) > similarity_threshold]
-        logger.debug(f"Filtered to {len(similar_items)} items with similarity > {similarity_threshold}")
-        
-        # Return only top N results per query
-        top_items = similar_items[:top_results]
-        logger.debug(f"Returning top {len(top_items)} results for '{q}'")
+        top_items = _top_scored(results, top_results)
+        logger.debug("Returning top %d results for %r", len(top_items), q)
         
         all_results.append({
             "query": q,
@@ -504,30 +726,107 @@ def search_database(
     return all_results
 
 
-def _calculate_price_range_for_item(
-    item: str, 
-    similarity_threshold: float, 
-    top_results: int,
-    rag_pipeline
-) -> dict:
+_PRICE_LABEL = "Price:"
+_NUMPY_STATS_MIN_PRICES = 16
+
+
+def _parse_leading_float(text: str, start: int = 0) -> Optional[float]:
     """
-    Helper function to calculate price range for a single item.
+    Parse an unsigned decimal number at ``text[start:]`` after optional whitespace.
     
-    Args:
-        item: Item name to search for
-        similarity_threshold: Minimum similarity score
-        top_results: Number of top results to use for price calculation
-        rag_pipeline: RAG pipeline instance
+    Accepts digits with at most one dot ("12", "12.5", "12."); returns None
+    when no digit follows.
     """
-    # Use search_database to get top similar items
-    top_items = search_database(
-        query=item,
-        similarity_threshold=similarity_threshold,
-        top_results=top_results,
-        n_results=20,
-        rag_pipeline=rag_pipeline
-    )
+    length = len(text)
+    while start < length and text[start].isspace():
+        start += 1
+    end = start
+    while end < length and "0" <= text[end] <= "9":
+        end += 1
+    if end == start:
+        return None
+    if end < length and text[end] == ".":
+        end += 1
+        while end < length and "0" <= text[end] <= "9":
+            end += 1
+    return float(text[start:end])
+
+# Per-item price range results, keyed by normalized item name and search
+# parameters. The item catalogue is static between ingests, so entries stay
+# valid for the TTL.
+_PRICE_CACHE_TTL = 300.0
+_PRICE_CACHE_MAX_ENTRIES = 1024
+_price_cache: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+_price_cache_lock = threading.Lock()
+
+
+def _price_cache_key(item, similarity_threshold: float, top_results: int) -> tuple:
+    return (str(item).lower().strip(), similarity_threshold, top_results)
+
+
+def _price_cache_get(key: tuple, item) -> Optional[dict]:
+    """Return a cached result relabelled for ``item``, or None on miss/expiry."""
+    with _price_cache_lock:
+        entry = _price_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > _PRICE_CACHE_TTL:
+            del _price_cache[key]
+            return None
+        _price_cache.move_to_end(key)
+    return {**result, "item": item}
+
+
+def _price_cache_put(key: tuple, result: dict) -> None:
+    with _price_cache_lock:
+        _price_cache[key] = (time.monotonic(), result)
+        _price_cache.move_to_end(key)
+        while len(_price_cache) > _PRICE_CACHE_MAX_ENTRIES:
+            _price_cache.popitem(last=False)
+
+
+def _top_scored(results: list[dict], top_results: int) -> list[dict]:
+    """
+    Keep the top_results highest-scoring results.
+    
+    The similarity threshold is applied by the RAG pipeline; this does not
+    rely on the store returning results sorted by score.
+    """
+    return heapq.nlargest(top_results, results, key=_result_score)
+
+
+def _result_score(result: dict) -> float:
+    return result.get("score", 0)
+
+
+def _price_stats(prices: list[float]) -> tuple[float, float, float]:
+    """Return (min, max, mean) of a non-empty price list."""
+    # numpy only pays off on longer price lists
+    if len(prices) >= _NUMPY_STATS_MIN_PRICES:
+        values = np.fromiter(prices, dtype=np.float64, count=len(prices))
+        return float(values.min()), float(values.max()), float(values.mean())
+
+    min_price = max_price = prices[0]
+    total = 0.0
+    for price in prices:
+        if price < min_price:
+            min_price = price
+        elif price > max_price:
+            max_price = price
+        total += price
+    return min_price, max_price, total / len(prices)
+
+
+def _price_range_from_results(item: str, top_items: list[dict], similarity_threshold: float) -> dict:
+    """
+    Compute the price range for an item from its already-filtered search results.
     
+    Args:
+        item: Item name the results belong to
+        top_items: Similar items above the threshold, best first
+        similarity_threshold: Threshold used for filtering (echoed in the result)
+    """
     if not top_items:
         return {
             "success": False,
@@ -542,13 +841,13 @@ def _calculate_price_range_for_item(
     for result in top_items:
         content = result.get("content", "")
         # Parse "Price: X.XX" from the formatted text
-        price_match = re.search(r"Price:\s*([0-9]+\.?[0-9]*)", content)
-        if price_match:
-            try:
-                price = float(price_match.group(1))
+        label_index = content.find(_PRICE_LABEL)
+        if label_index >= 0:
+            price = _parse_leading_float(content, label_index + len(_PRICE_LABEL))
+            if price is not None:
                 prices.append(price)
-            except ValueError:
-                logger.warning(f"Could not parse price: {price_match.group(1)}")
+            else:
+                logger.warning("Could not parse price in: %r", content[label_index:label_index + 32])
 
     if not prices:
         return {
@@ -558,10 +857,7 @@ def _calculate_price_range_for_item(
             "similar_items_count": len(top_items)
         }
 
-    # Calculate price range
-    min_price = min(prices)
-    max_price = max(prices)
-    avg_price = sum(prices) / len(prices)
+    min_price, max_price, avg_price = _price_stats(prices)
 
     return {
         "success": True,
@@ -577,13 +873,34 @@ def _calculate_price_range_for_item(
     }
 
 
+def _compute_price_ranges(
+    items_list: list,
+    similarity_threshold: float,
+    top_results: int,
+    rag_pipeline
+) -> list[dict]:
+    """Search and price every item, preserving input order."""
+    # Embed all items once and share one batched vector search. Results
+    # are cached by exact item name only (see _price_cache): near-identical
+    # product names ("oat milk 1L" vs "2L") must not share prices.
+    search_rows = rag_pipeline.search_batch(
+        items_list,
+        n_results=20,
+        min_score=similarity_threshold
+    )
+    return [
+        _price_range_from_results(item, _top_scored(rows, top_results), similarity_threshold)
+        for item, rows in zip(items_list, search_rows)
+    ]
+
+
 @tools.register
-def get_price_range(
-    items: str, 
+async def get_price_range(
+    items: Union[str, list], 
     similarity_threshold: float = 0.5, 
     top_results: int = 5,
     registry: ToolRegistry = None
-) -> str:
+) -> bytes:
     """
     Search for similar items in the vector DB and calculate price ranges.
     
@@ -594,54 +911,81 @@ def get_price_range(
     
     Returns min/max/avg price from top N similar items for each queried item.
     """
+    # Embedding and the Chroma queries block, so keep them off the event loop
+    return await asyncio.to_thread(
+        _get_price_range, items, similarity_threshold, top_results, registry
+    )
+
+
+def _get_price_range(
+    items: Union[str, list],
+    similarity_threshold: float,
+    top_results: int,
+    registry: Optional[ToolRegistry]
+) -> bytes:
     if not registry or not registry.rag_pipeline:
         logger.error("RAG pipeline not initialized")
-        return json.dumps({
-            "success": False,
-            "error": "RAG pipeline not initialized"
-        })
+        return _ERR_NO_RAG
 
     try:
-        # Parse items - could be JSON array or single string
-        try:
-            items_list = json.loads(items)
-            if not isinstance(items_list, list):
+        # Parse items - could be a list, JSON array or single string
+        if isinstance(items, list):
+            items_list = items
+        else:
+            # If not a JSON array, treat as single item
+            items_list = _maybe_parse_json_list(items)
+            if items_list is None:
                 items_list = [items]
-        except (json.JSONDecodeError, TypeError):
-            # If not valid JSON, treat as single item
-            items_list = [items]
         
-        logger.info(f"get_price_range called for {len(items_list)} items, threshold={similarity_threshold}, top_results={top_results}")
+        logger.info(
+            "get_price_range called for %d items, threshold=%s, top_results=%s",
+            len(items_list), similarity_threshold, top_results
+        )
+        
+        # Serve repeated items from the cache, search only the misses
+        results = [None] * len(items_list)
+        misses = []
+        for index, item in enumerate(items_list):
+            cached = _price_cache_get(_price_cache_key(item, similarity_threshold, top_results), item)
+            if cached is None:
+                misses.append(index)
+            else:
+                results[index] = cached
         
-        # Calculate price range for each item
-        results = []
-        for item in items_list:
-            item_result = _calculate_price_range_for_item(
-                item, 
+        if misses:
+            miss_items = [items_list[index] for index in misses]
+            computed = _compute_price_ranges(
+                miss_items,
                 similarity_threshold,
                 top_results,
                 registry.rag_pipeline
             )
-            results.append(item_result)
-            
+            for index, item, item_result in zip(misses, miss_items, computed):
+                results[index] = item_result
+                _price_cache_put(_price_cache_key(item, similarity_threshold, top_results), item_result)
+        
+        logger.debug("Price cache: %d hits, %d misses", len(items_list) - len(misses), len(misses))
+        
+        successful = 0
+        for item, item_result in zip(items_list, results):
             if item_result["success"]:
+                successful += 1
                 pr = item_result["price_range"]
-                logger.info(f"✓ {item}: €{pr['min']:.2f} - €{pr['max']:.2f} (avg: €{pr['average']:.2f})")
+                logger.info("✓ %s: €%.2f - €%.2f (avg: €%.2f)", item, pr["min"], pr["max"], pr["average"])
             else:
-                logger.warning(f"✗ {item}: {item_result.get('error', 'Unknown error')}")
+                logger.warning("✗ %s: %s", item, item_result.get("error", "Unknown error"))
         
         # Return results
-        successful = sum(1 for r in results if r["success"])
-        return json.dumps({
+        return json_utils.dumps_bytes({
             "success": successful > 0,
             "items_processed": len(results),
             "items_successful": successful,
             "results": results
-        }, indent=2)
+        })
 
     except Exception as e:
-        logger.error(f"get_price_range failed: {e}", exc_info=True)
-        return json.dumps({
+        logger.error("get_price_range failed: %s", e, exc_info=True)
+        return json_utils.dumps_bytes({
             "success": False,
             "error": str(e)
         })
\ No newline at end of file
@@ -2,11 +2,11 @@
 Central registry for all tools with OpenAI schema generation.
 """
 
-import json
 import inspect
 from typing import Callable, Any, Optional
 from datetime import datetime
 
+from app import json_utils
 from app.logger import get_logger
 
 logger = get_logger(__name__)
@@ -17,6 +17,7 @@ class ToolRegistry:
 
     def __init__(self, rag_pipeline=None):
         self._tools: dict[str, dict[str, Any]] = {}
+        self._schema_cache: dict[tuple, list[dict]] = {}
         self.rag_pipeline = rag_pipeline
         logger.info("ToolRegistry initialized")
 
@@ -57,17 +58,85 @@ class ToolRegistry:
             "function": func,
             "description": func.__doc__ or "",
             "parameters": params,
-            "required": required
+            "required": required,
+            "has_registry": 'registry' in sig.parameters,
+            "is_coroutine": inspect.iscoroutinefunction(func),
+            "binder": self._make_binder(sig),
         }
+        self._schema_cache.clear()
 
         logger.info(f"Tool registered: {func.__name__}")
         return func
 
-    def get_openai_schema(self) -> list[dict]:
-        """Generate OpenAI tools schema from registered tools."""
+    @staticmethod
+    def _make_binder(sig: inspect.Signature) -> Optional[tuple[tuple[str, Any], ...]]:
+        """
+        Precompute (name, default) pairs in positional order for a tool.
+
+        Returns None when the signature has keyword-only or variadic
+        parameters; those tools are called with keyword arguments instead.
+        """
+        binder = []
+        for name, param in sig.parameters.items():
+            if param.kind not in (
+                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            ):
+                return None
+            binder.append((name, param.default))
+        return tuple(binder)
+
+    def _bind(self, tool_name: str, binder: tuple, arguments: dict) -> list:
+        """Turn LLM-supplied keyword arguments into a positional argument list."""
+        args = []
+        used = 0
+        for name, default in binder:
+            if name == 'registry':
+                # Always the live registry, even if the model supplied one
+                args.append(self)
+                used += name in arguments
+            elif name in arguments:
+                args.append(arguments[name])
+                used += 1
+            elif default is not inspect.Parameter.empty:
+                args.append(default)
+            else:
+                raise TypeError(f"{tool_name}() missing required argument: '{name}'")
+        if used != len(arguments):
+            known = {name for name, _ in binder}
+            unexpected = sorted(set(arguments) - known)
+            raise TypeError(f"{tool_name}() got unexpected arguments: {unexpected}")
+        return args
+
+    def get_openai_schema(
+        self,
+        include: Optional[set[str]] = None,
+        exclude: Optional[set[str]] = None,
+    ) -> list[dict]:
+        """Generate OpenAI tools schema from registered tools.
+
+        Args:
+            include: Only expose these tool names (default: all tools)
+            exclude: Tool names to leave out of the schema
+
+        Schemas are cached per (include, exclude) pair until the next
+        registration; callers must not mutate the returned list.
+        """
+        key = (
+            frozenset(include) if include is not None else None,
+            frozenset(exclude) if exclude else None,
+        )
+        cached = self._schema_cache.get(key)
+        if cached is not None:
+            return cached
+
         schema = []
 
         for name, tool in self._tools.items():
+            if include is not None and name not in include:
+                continue
+            if exclude and name in exclude:
+                continue
             schema.append({
                 "type": "function",
                 "function": {
@@ -81,27 +150,34 @@ class ToolRegistry:
                 }
             })
 
+        self._schema_cache[key] = schema
         return schema
 
     async def execute(self, tool_name: str, arguments: dict) -> str:
         """Execute a tool by name."""
         if tool_name not in self._tools:
             logger.error(f"Unknown tool requested: {tool_name}")
-            return json.dumps({"error": f"Unknown tool: {tool_name}"})
+            return json_utils.dumps({"error": f"Unknown tool: {tool_name}"})
 
         tool = self._tools[tool_name]
         try:
             func = tool["function"]
-            sig = inspect.signature(func)
 
-            if 'registry' in sig.parameters:
-                arguments['registry'] = self
+            binder = tool["binder"]
+            if binder is not None:
+                result = func(*self._bind(tool_name, binder, arguments))
+            else:
+                if tool["has_registry"]:
+                    arguments['registry'] = self
+                result = func(**arguments)
 
-            result = func(**arguments)
-
-            if inspect.iscoroutine(result):
+            if tool["is_coroutine"]:
                 result = await result
 
+            # Tools may return pre-encoded JSON bytes; the LLM boundary needs str
+            if isinstance(result, bytes):
+                result = result.decode()
+
             return result
         except Exception as e:
             logger.error(
@@ -109,7 +185,7 @@ class ToolRegistry:
                 exc_info=True,
                 extra={"tool_name": tool_name}
             )
-            return json.dumps({"error": str(e), "tool": tool_name})
+            return json_utils.dumps({"error": str(e), "tool": tool_name})
 
     def get_tool_names(self) -> list[str]:
         """Get list of registered tool names."""
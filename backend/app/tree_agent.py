@@ -9,13 +9,13 @@ All output goes through tools (tool_choice="required"):
 This guarantees the LLM never dumps raw markdown trees as plain text.
 """
 
-import json
 import os
 from typing import AsyncGenerator
-from openai import AsyncOpenAI
+from app import json_utils
 from app.models import ErrorOutput
 from app.models.context import Context
 from app.logger import get_logger
+from app.openai_client import get_openai_client
 
 logger = get_logger(__name__)
 
@@ -117,15 +117,50 @@ EMIT_TOOLS: list[dict] = [
 ]
 
 
-# ── System prompt loader ────────────────────────────────────────────────────
+# ── System prompt ───────────────────────────────────────────────────────────
 
 _INSTRUCTIONS_PATH = os.path.join(os.path.dirname(__file__), "instructions.md")
 
+# Static for the process lifetime; read once at import instead of per turn.
+with open(_INSTRUCTIONS_PATH, "r", encoding="utf-8") as _f:
+    _SYSTEM_PROMPT = _f.read()
 
-def _load_system_prompt(context: Context) -> str:
-    with open(_INSTRUCTIONS_PATH, "r", encoding="utf-8") as f:
-        template = f.read()
-    return template
+# Shared across requests; never mutated
+_SYSTEM_MSG = {"role": "system", "content": _SYSTEM_PROMPT}
+
+
+# ── Output frames ───────────────────────────────────────────────────────────
+# Frames are assembled directly as UTF-8 bytes around a fixed prefix, so each
+# streamed event costs one orjson encode and no dict or str round-trip.
+
+
+def _text_frame(content: str) -> bytes:
+    return b'{"type":"text","content":' + json_utils.dumps_bytes(content) + b"}"
+
+
+def _tree_frame(kind: bytes, nodes: list[dict]) -> bytes:
+    return b'{"type":"' + kind + b'","nodes":' + json_utils.dumps_bytes(nodes) + b"}"
+
+
+_PREFACE_TEXT = "Got it — here are the current trees."
+_BRIDGE_TEXT = "Now let's look at what the venue itself will need:"
+_PREFACE_FRAME = _text_frame(_PREFACE_TEXT)
+_BRIDGE_FRAME = _text_frame(_BRIDGE_TEXT)
+
+# Upper bound on buffered argument text per tool call; a runaway generation is
+# cut off instead of being held in memory until the stream ends.
+_MAX_TOOL_ARGS_CHARS = 256 * 1024
+
+# Per-turn emission state, tracked as a bitmask
+_EMITTED_PEOPLE = 1
+_EMITTED_PLACE = 2
+_EMITTED_TEXT = 4
+
+# Tree-emitting tools → (frame type, state bit); each is emitted once per turn
+_TREE_TOOLS = {
+    "emit_people_tree": ("people_tree", _EMITTED_PEOPLE),
+    "emit_place_tree": ("place_tree", _EMITTED_PLACE),
+}
 
 
 # ── TreeAgent ───────────────────────────────────────────────────────────────
@@ -135,27 +170,42 @@ class TreeAgent:
     """Streaming agent that builds event-planning trees via OpenAI tool calling."""
 
     def __init__(self, api_key: str, model: str = "gpt-4.1"):
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = get_openai_client(api_key)
         self.model = model
-        logger.info(f"TreeAgent initialized with model: {model}")
+        logger.info("TreeAgent initialized with model: %s", model)
 
     async def stream_response(
         self,
         context: Context,
         user_message: str,
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Stream structured responses via tool calls only.
 
-        Yields JSON strings suitable for SSE `data:` lines.
+        Yields UTF-8 JSON frames (bytes) suitable for SSE `data:` lines.
+        """
+        async for batch in self.stream_batches(context, user_message):
+            for frame in batch:
+                yield frame
+
+    async def stream_batches(
+        self,
+        context: Context,
+        user_message: str,
+    ) -> AsyncGenerator[list[bytes], None]:
+        """Like `stream_response`, but yields the frames of a turn together.
+
+        All frames produced from one finished completion (preface, trees,
+        bridge, text) arrive as one list so the transport can write them
+        in a single send.
         """
-        logger.info(f"TreeAgent stream for: {user_message[:80]!r}")
+        logger.info("TreeAgent stream for: %r", user_message[:80])
 
         context.add_message("user", user_message)
         messages = self._prepare_messages(context)
 
         max_iterations = 10
         for iteration in range(max_iterations):
-            logger.debug(f"TreeAgent iteration {iteration + 1}")
+            logger.debug("TreeAgent iteration %d", iteration + 1)
 
             stream = await self.client.chat.completions.create(
                 model=self.model,
@@ -167,144 +217,130 @@ class TreeAgent:
                 temperature=0.7,
             )
 
-            # tool_calls indexed by delta.tool_calls[].index
-            tool_calls: dict[int, dict] = {}
+            # tool_calls[i] holds the call with delta.tool_calls[].index == i
+            tool_calls: list[dict] = []
             collected_text_for_context: list[str] = []
-            emitted_people = False
-            emitted_place = False
-            emitted_text = False
-            inserted_preface = False
+            state = 0
+            finish = None
+            oversized: dict | None = None
 
             async for chunk in stream:
-                delta = chunk.choices[0].delta
+                choice = chunk.choices[0]
+                tc_deltas = choice.delta.tool_calls
 
                 # ── Accumulate tool-call deltas ─────────────────────────
-                if delta.tool_calls:
-                    for tc_delta in delta.tool_calls:
+                if tc_deltas:
+                    for tc_delta in tc_deltas:
                         idx = tc_delta.index
-                        if idx not in tool_calls:
-                            tool_calls[idx] = {
-                                "id": "",
-                                "name": "",
-                                "arguments": "",
-                            }
+                        while len(tool_calls) <= idx:
+                            tool_calls.append(
+                                {"id": "", "name": "", "arguments": [], "size": 0}
+                            )
+                        entry = tool_calls[idx]
                         if tc_delta.id:
-                            tool_calls[idx]["id"] = tc_delta.id
-                        if tc_delta.function:
-                            if tc_delta.function.name:
-                                tool_calls[idx]["name"] = tc_delta.function.name
-                            if tc_delta.function.arguments:
-                                tool_calls[idx]["arguments"] += (
-                                    tc_delta.function.arguments
-                                )
-
-                # ── Finish ──────────────────────────────────────────────
-                finish = chunk.choices[0].finish_reason
+                            entry["id"] = tc_delta.id
+                        fn = tc_delta.function
+                        if fn:
+                            if fn.name:
+                                entry["name"] = fn.name
+                            if fn.arguments:
+                                entry["arguments"].append(fn.arguments)
+                                entry["size"] += len(fn.arguments)
+                                if entry["size"] > _MAX_TOOL_ARGS_CHARS:
+                                    oversized = entry
+                                    break
+                    if oversized is not None:
+                        break
+
+                finish = choice.finish_reason
                 if finish in ("tool_calls", "stop"):
-                    # Process all completed tool calls
-                    assistant_tool_calls = []
-                    has_only_text = True
-
-                    for idx in sorted(tool_calls):
-                        tc = tool_calls[idx]
-                        assistant_tool_calls.append(
-                            {
-                                "id": tc["id"],
-                                "type": "function",
-                                "function": {
-                                    "name": tc["name"],
-                                    "arguments": tc["arguments"],
-                                },
-                            }
-                        )
-
-                        try:
-                            args = json.loads(tc["arguments"])
-                            output_json = self._build_output_json(
-                                tc["name"], args
+                    break
+
+            # Release the connection before the (CPU-bound) emit pipeline
+            await stream.close()
+            if oversized is not None:
+                logger.error(
+                    "Tool arguments for %s exceeded %d chars; aborting turn",
+                    oversized["name"] or "<unnamed>",
+                    _MAX_TOOL_ARGS_CHARS,
+                )
+                yield [
+                    ErrorOutput(
+                        message="Tool arguments too large",
+                        code="TOOL_ARGS_TOO_LARGE",
+                    ).model_dump_json().encode()
+                ]
+                return
+            if finish not in ("tool_calls", "stop"):
+                continue
+
+            # ── Finish ──────────────────────────────────────────────────
+            # Process all completed tool calls
+            frames: list[bytes] = []
+            for tc in tool_calls:
+                name = tc["name"]
+                if not name:
+                    continue  # placeholder for an index the stream skipped
+                raw_args = "".join(tc["arguments"])
+                tree = _TREE_TOOLS.get(name)
+                if tree is not None and state & tree[1]:
+                    logger.info("Skipping duplicate %s", tree[0])
+                    continue
+
+                try:
+                    args = json_utils.loads(raw_args)
+                    output_json = self._build_output_json(name, args)
+                    if output_json:
+                        if tree is not None:
+                            if not state & _EMITTED_TEXT:
+                                frames.append(_PREFACE_FRAME)
+                                collected_text_for_context.append(
+                                    _PREFACE_TEXT
+                                )
+                            state |= tree[1] | _EMITTED_TEXT
+
+                        # Bridge text between the two trees
+                        if (
+                            name == "emit_place_tree"
+                            and state & _EMITTED_PEOPLE
+                        ):
+                            frames.append(_BRIDGE_FRAME)
+                            collected_text_for_context.append(_BRIDGE_TEXT)
+
+                        frames.append(output_json)
+                        logger.info("Emitted %s", name)
+
+                        # Track text for conversation context
+                        if name == "emit_text":
+                            collected_text_for_context.append(
+                                args["content"]
                             )
-                            if output_json:
-                                if tc["name"] == "emit_people_tree":
-                                    if emitted_people:
-                                        logger.info(
-                                            "Skipping duplicate people_tree"
-                                        )
-                                        continue
-                                    emitted_people = True
-                                    if not emitted_text and not inserted_preface:
-                                        preface = {
-                                            "type": "text",
-                                            "content": "Got it — here are the current trees.",
-                                        }
-                                        yield json.dumps(preface)
-                                        collected_text_for_context.append(
-                                            preface["content"]
-                                        )
-                                        emitted_text = True
-                                        inserted_preface = True
-                                if tc["name"] == "emit_place_tree":
-                                    if emitted_place:
-                                        logger.info(
-                                            "Skipping duplicate place_tree"
-                                        )
-                                        continue
-                                    emitted_place = True
-                                    if not emitted_text and not inserted_preface:
-                                        preface = {
-                                            "type": "text",
-                                            "content": "Got it — here are the current trees.",
-                                        }
-                                        yield json.dumps(preface)
-                                        collected_text_for_context.append(
-                                            preface["content"]
-                                        )
-                                        emitted_text = True
-                                        inserted_preface = True
-
-                                # Bridge text between the two trees
-                                if (
-                                    tc["name"] == "emit_place_tree"
-                                    and emitted_people
-                                ):
-                                    bridge = {
-                                        "type": "text",
-                                        "content": (
-                                            "Now let's look at what the venue "
-                                            "itself will need:"
-                                        ),
-                                    }
-                                    yield json.dumps(bridge)
-                                    collected_text_for_context.append(
-                                        bridge["content"]
-                                    )
-
-                                yield output_json
-                                logger.info(f"Emitted {tc['name']}")
-
-                                # Track text for conversation context
-                                if tc["name"] == "emit_text":
-                                    collected_text_for_context.append(
-                                        args["content"]
-                                    )
-                                    emitted_text = True
-                                else:
-                                    has_only_text = False
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Bad tool args: {e}")
-                            yield ErrorOutput(
-                                message=f"Invalid tool arguments for {tc['name']}",
-                                code="TOOL_PARSE_ERROR",
-                            ).model_dump_json()
-
-                    # Save text to conversation history
-                    if collected_text_for_context:
-                        context.add_message(
-                            "assistant",
-                            "\n".join(collected_text_for_context),
-                        )
-
-                    # Done for this turn — all tool calls processed.
-                    return
+                            state |= _EMITTED_TEXT
+                except json_utils.JSONDecodeError as e:
+                    logger.error("Bad tool args: %s", e)
+                    frames.append(
+                        ErrorOutput(
+                            message=f"Invalid tool arguments for {name}",
+                            code="TOOL_PARSE_ERROR",
+                        ).model_dump_json().encode()
+                    )
+
+            # Save text to conversation history
+            if len(collected_text_for_context) == 1:
+                context.add_message(
+                    "assistant", collected_text_for_context[0]
+                )
+            elif collected_text_for_context:
+                context.add_message(
+                    "assistant",
+                    "\n".join(collected_text_for_context),
+                )
+
+            if frames:
+                yield frames
+
+            # Done for this turn — all tool calls processed.
+            return
 
         logger.warning("TreeAgent hit max iterations")
 
@@ -312,28 +348,41 @@ class TreeAgent:
 
     @staticmethod
     def _propagate_selection(nodes: list[dict]) -> None:
-        """Ensure parent nodes are selected when any child is selected."""
-        for node in nodes:
-            children = node.get("children", []) or []
-            if children:
-                TreeAgent._propagate_selection(children)
+        """Ensure parent nodes are selected when any child is selected.
+
+        Iterative post-order walk: children are settled before their parent,
+        without recursion depth limits on deep trees. Leaves never change,
+        so only internal nodes are ever pushed.
+        """
+        stack: list[tuple[dict, list]] = [
+            (node, None) for node in nodes if node.get("children")
+        ]
+        while stack:
+            node, children = stack.pop()
+            if children is not None:
                 if any(child.get("selected") for child in children):
                     node["selected"] = True
+                continue
+            children = node["children"]
+            stack.append((node, children))
+            stack.extend(
+                (child, None) for child in children if child.get("children")
+            )
 
     @staticmethod
-    def _build_output_json(name: str, args: dict) -> str | None:
-        """Build JSON string for the frontend.
+    def _build_output_json(name: str, args: dict) -> bytes | None:
+        """Build the JSON frame (bytes) for the frontend.
 
         Tree data is passed through as-is (already validated by OpenAI
         strict mode) to avoid Pydantic re-validation issues with
         recursive models.
         """
         if name == "emit_text":
-            return json.dumps({"type": "text", "content": args["content"]})
+            return _text_frame(args["content"])
         if name == "emit_people_tree":
             nodes = args.get("nodes", [])
             TreeAgent._propagate_selection(nodes)
-            return json.dumps({"type": "people_tree", "nodes": nodes})
+            return _tree_frame(b"people_tree", nodes)
         if name == "emit_place_tree":
             nodes = args.get("nodes", [])
             if len(nodes) > 6:
@@ -343,13 +392,10 @@ class TreeAgent:
                 )
                 nodes = nodes[:6]
             TreeAgent._propagate_selection(nodes)
-            return json.dumps({"type": "place_tree", "nodes": nodes})
-        logger.warning(f"Unknown tool: {name}")
+            return _tree_frame(b"place_tree", nodes)
+        logger.warning("Unknown tool: %s", name)
         return None
 
     def _prepare_messages(self, context: Context) -> list[dict]:
         """Build the messages list with system prompt + conversation history."""
-        system_prompt = _load_system_prompt(context)
-        messages: list[dict] = [{"role": "system", "content": system_prompt}]
-        messages.extend(context.get_conversation_history())
-        return messages
+        return [_SYSTEM_MSG, *context.get_conversation_history()]
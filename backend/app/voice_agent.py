@@ -11,13 +11,17 @@ Manages voice-based event planning flow through multiple phases:
 7. Purchase confirmation
 """
 
+import asyncio
+import io
 import os
 import hashlib
-import json
+import re
+from collections import OrderedDict
+from pathlib import Path
 from typing import Optional, AsyncGenerator
-from openai import AsyncOpenAI
 from rapidfuzz import fuzz, process
 
+from app import json_utils
 from app.models.context import Context
 from app.models import TreeNode
 from pydantic import TypeAdapter
@@ -26,13 +30,104 @@ from app.form_agent import FormAgent
 from app.shopping_list_agent import ShoppingListAgent
 from app.shopping_agent import ShoppingAgent
 from app.logger import get_logger
+from app.openai_client import get_openai_client
 
 logger = get_logger(__name__)
 
+_NON_WORD_RE = re.compile(r"\W+")
+_AUDIO_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+# Leading bytes of TreeAgent's compact tree frames
+_PEOPLE_TREE_FRAME = b'{"type":"people_tree",'
+_PLACE_TREE_FRAME = b'{"type":"place_tree",'
+
+# ── Spoken numbers (see VoiceAgent.words_to_numbers) ─────────────────────────
+
+_NUMBER_WORDS = {
+    'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
+    'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
+    'ten': '10', 'eleven': '11', 'twelve': '12', 'thirteen': '13',
+    'fourteen': '14', 'fifteen': '15', 'sixteen': '16', 'seventeen': '17',
+    'eighteen': '18', 'nineteen': '19', 'twenty': '20', 'thirty': '30',
+    'forty': '40', 'fifty': '50', 'sixty': '60', 'seventy': '70',
+    'eighty': '80', 'ninety': '90',
+}
+_MULTIPLIERS = {'hundred': '100', 'thousand': '1000'}
+
+_NUMBER_WORD_RE = re.compile(r"\b(?:" + "|".join(_NUMBER_WORDS) + r")\b")
+_COMPOUND_RE = re.compile(r"\b([2-9]0)[ -]([1-9])\b")
+_HUNDRED_RE = re.compile(r"\b(\d+) hundred\b")
+_THOUSAND_RE = re.compile(r"\b(\d+) thousand\b")
+_MULTIPLIER_RE = re.compile(r"\b(?:hundred|thousand)\b")
+
+# ── Intent keywords (matched on whole words) ──────────────────────────────────
+
+_WORD_RE = re.compile(r"[a-z']+")
+_YES_WORDS = frozenset({"yes", "yeah", "yep", "sure", "correct", "right", "ok", "okay"})
+_NO_WORDS = frozenset({"no", "nope", "nah", "incorrect", "wrong"})
+
+_HEAR_REMAINING_RE = re.compile(r"\b(?:remaining|rest|others?|more categories|what else)\b")
+_ADD_MORE_RE = re.compile(r"\b(?:add|adding|additional|more|another|also)\b")
+_DONE_RE = re.compile(r"\b(?:done|proceed|ready|continue|yes|finish(?:ed)?)\b")
+
+_FILLER_WORDS = frozenset({"uh", "um", "umm", "hmm", "mm", "ah", "eh", "er", "erm"})
+
+# Phases that don't read the user's words
+_INPUTLESS_PHASES = frozenset({"greeting", "done"})
+
+# ── Fixed prompts (pre-synthesized by VoiceAgent.warm_cache) ─────────────────
+
+_GREETING_TEXT = "Hello, please tell me what you are organizing so I can further assist you."
+_NO_VALID_CATEGORIES_TEXT = "I didn't catch any valid categories. Could you repeat which categories you need?"
+_ASK_CATEGORIES_TEXT = "Okay, which categories do you need?"
+_YES_NO_RETRY_TEXT = "I didn't understand. Please say yes or no."
+_COMPLETION_CHECK_TEXT = "We've gone through your selected categories. Would you like to hear the remaining categories, add more specific categories, or are you done and ready to proceed?"
+_NO_REMAINING_TEXT = "There are no remaining categories. Are you ready to proceed?"
+_ASK_ADDITIONAL_TEXT = "Which additional categories would you like to add?"
+_COMPLETION_RETRY_TEXT = "I didn't understand. Would you like to hear the remaining categories, add more, or are you done?"
+_LIST_READY_TEXT = "I've prepared your shopping list. Would you like me to read it out?"
+_READOUT_RETRY_TEXT = "I didn't understand. Would you like me to read out the shopping list? Please say yes or no."
+_EMPTY_LIST_TEXT = "The shopping list is empty."
+_PURCHASE_DONE_TEXT = "Great! Your purchase was successful. Thank you for using our service!"
+_PURCHASE_SAVED_TEXT = "No problem. Your shopping list has been saved. You can come back anytime to complete your purchase."
+_PURCHASE_RETRY_TEXT = "I didn't understand. Would you like to continue with the purchase? Please say yes or no."
+_SESSION_DONE_TEXT = "The voice session is complete. Thank you!"
+_DIDNT_HEAR_TEXT = "Sorry, I didn't catch that. Could you say it again?"
+
+_CONSTANT_PROMPTS = (
+    _GREETING_TEXT,
+    _NO_VALID_CATEGORIES_TEXT,
+    _ASK_CATEGORIES_TEXT,
+    _YES_NO_RETRY_TEXT,
+    _COMPLETION_CHECK_TEXT,
+    _NO_REMAINING_TEXT,
+    _ASK_ADDITIONAL_TEXT,
+    _COMPLETION_RETRY_TEXT,
+    _LIST_READY_TEXT,
+    _READOUT_RETRY_TEXT,
+    _EMPTY_LIST_TEXT,
+    _PURCHASE_DONE_TEXT,
+    _PURCHASE_SAVED_TEXT,
+    _PURCHASE_RETRY_TEXT,
+    _SESSION_DONE_TEXT,
+    _DIDNT_HEAR_TEXT,
+)
+
+
+def _join_and(items: list[str]) -> str:
+    """Join items for speech: 'a', 'a and b', 'a, b and c'."""
+    if len(items) > 1:
+        return f"{', '.join(items[:-1])} and {items[-1]}"
+    return items[0] if items else ""
+
 
 class VoiceAgent:
     """Orchestrates voice-based interaction flow with TTS/STT."""
 
+    TTS_MODEL = "tts-1"
+    TTS_CACHE_SIZE = 512
+    TREE_CACHE_SIZE = 128
+
     def __init__(
         self,
         api_key: str,
@@ -42,8 +137,9 @@ class VoiceAgent:
         shopping_agent: ShoppingAgent,
         model: str = "gpt-4.1",
         tts_voice: str = "alloy",
+        tts_cache_dir: str = "./tts_cache",
     ):
-        self.client = AsyncOpenAI(api_key=api_key)
+        self.client = get_openai_client(api_key)
         self.model = model
         self.tts_voice = tts_voice
         self.tree_agent = tree_agent
@@ -51,62 +147,255 @@ class VoiceAgent:
         self.shopping_list_agent = shopping_list_agent
         self.shopping_agent = shopping_agent
         
-        # TTS audio cache (in-memory, audio_id -> bytes)
-        self.tts_cache: dict[str, bytes] = {}
+        # TTS audio cache (in-memory LRU, audio_id -> bytes). The fixed
+        # prompts are also kept in <tts_cache_dir>/<audio_id>.mp3 so they
+        # survive restarts; per-session text is never written to disk.
+        self.tts_cache: OrderedDict[str, bytes] = OrderedDict()
+        self.tts_cache_dir = Path(tts_cache_dir)
+        self.tts_cache_dir.mkdir(exist_ok=True)
+        self._persisted_ids = frozenset(self._tts_key(text) for text in _CONSTANT_PROMPTS)
+        # Texts handed out as audio_ids but not synthesized yet (audio_id -> text)
+        self.tts_pending: OrderedDict[str, str] = OrderedDict()
+        # Background syntheses in flight (audio_id -> task)
+        self._tts_inflight: dict[str, asyncio.Task] = {}
+        
+        # Generated trees and the history turns that produced them, per
+        # normalized event description (LRU, JSON bytes)
+        self.tree_cache: OrderedDict[str, bytes] = OrderedDict()
+        
+        # Phase -> handler, all called as handler(context, state, user_input)
+        self._phase_handlers = {
+            "greeting": lambda context, state, _: self.handle_greeting_phase(context, state),
+            "event_type": self.handle_event_type_phase,
+            "category_confirmation": self.handle_category_confirmation,
+            "category_selection": self.handle_category_selection_phase,
+            "subcategory_selection": self.handle_subcategory_selection_phase,
+            "completion_check": self.handle_completion_check_phase,
+            "form_collection": self.handle_form_collection_phase,
+            "shopping_list_readout_prompt": self.handle_shopping_list_prompt,
+            "shopping_list_readout": lambda context, state, _: self.read_shopping_list(context, state),
+            "purchase_confirmation": self.handle_purchase_confirmation,
+            "done": lambda context, state, _: self.handle_done_phase(context, state),
+        }
         
         logger.info(f"VoiceAgent initialized with model: {model}, voice: {tts_voice}")
 
     # ── TTS & STT utilities ─────────────────────────────────────────────
 
+    def _tts_key(self, text: str) -> str:
+        # Cache key covers everything that shapes the audio, not just the text
+        return hashlib.blake2b(
+            f"{self.tts_voice}|{self.TTS_MODEL}|{text}".encode(), digest_size=16
+        ).hexdigest()
+
+    def _audio_path(self, audio_id: str) -> Optional[Path]:
+        # audio_id arrives from the URL; only our own hex digests map to files
+        if not _AUDIO_ID_RE.fullmatch(audio_id):
+            return None
+        return self.tts_cache_dir / f"{audio_id}.mp3"
+
+    def _remember_audio(self, cache_key: str, audio_bytes: bytes) -> None:
+        self.tts_cache[cache_key] = audio_bytes
+        while len(self.tts_cache) > self.TTS_CACHE_SIZE:
+            self.tts_cache.popitem(last=False)
+
+    async def _store_audio(self, cache_key: str, audio_bytes: bytes) -> None:
+        self._remember_audio(cache_key, audio_bytes)
+        self.tts_pending.pop(cache_key, None)
+        if cache_key not in self._persisted_ids:
+            return
+        try:
+            await asyncio.to_thread(self._write_audio_file, cache_key, audio_bytes)
+        except OSError as e:
+            logger.warning(f"Could not persist TTS audio {cache_key}: {e}")
+
+    def _write_audio_file(self, cache_key: str, audio_bytes: bytes) -> None:
+        path = self._audio_path(cache_key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(audio_bytes)
+        os.replace(tmp_path, path)
+
+    def _prune_audio_files(self) -> int:
+        # Drop files left by older versions or by a changed voice/model
+        removed = 0
+        for path in self.tts_cache_dir.iterdir():
+            if path.stem not in self._persisted_ids:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
     async def generate_tts(self, text: str) -> tuple[bytes, str]:
         """Generate TTS audio and return (audio_bytes, cache_id)."""
-        # Generate cache key from text
-        cache_key = hashlib.md5(text.encode()).hexdigest()
+        cache_key = self._tts_key(text)
         
-        if cache_key in self.tts_cache:
+        cached = self.get_cached_audio(cache_key)
+        if cached is not None:
             logger.debug(f"TTS cache hit: {cache_key}")
-            return self.tts_cache[cache_key], cache_key
+            return cached, cache_key
         
         logger.info(f"Generating TTS for: {text[:50]}...")
         response = await self.client.audio.speech.create(
-            model="tts-1",
+            model=self.TTS_MODEL,
             voice=self.tts_voice,
             input=text,
             response_format="mp3",
         )
         
         audio_bytes = response.content
-        self.tts_cache[cache_key] = audio_bytes
+        await self._store_audio(cache_key, audio_bytes)
         logger.debug(f"TTS generated: {cache_key}, size: {len(audio_bytes)} bytes")
         return audio_bytes, cache_key
 
-    async def transcribe_audio(self, audio_bytes: bytes) -> str:
-        """Transcribe audio using Whisper API."""
-        logger.info(f"Transcribing audio, size: {len(audio_bytes)} bytes")
+    def prepare_tts(self, text: str) -> str:
+        """Return the audio_id for ``text`` without waiting for synthesis.
+
+        Uncached text is synthesized when the audio is fetched (see
+        ``stream_tts``), so the reply reaches the client before TTS starts.
+        """
+        cache_key = self._tts_key(text)
+        if cache_key not in self.tts_cache and not (
+            cache_key in self._persisted_ids and self._audio_path(cache_key).exists()
+        ):
+            self.tts_pending[cache_key] = text
+            self.tts_pending.move_to_end(cache_key)
+            while len(self.tts_pending) > self.TTS_CACHE_SIZE:
+                self.tts_pending.popitem(last=False)
+        return cache_key
+
+    async def open_tts_stream(self, audio_id: str) -> Optional[AsyncGenerator[bytes, None]]:
+        """Start ``stream_tts`` and return it, or None if it has nothing to send.
+
+        The first chunk is awaited here so an unknown or evicted id can be
+        answered with a 404 instead of an empty 200.
+        """
+        stream = self.stream_tts(audio_id)
+        try:
+            first_chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            return None
         
-        # Save to temp file (Whisper requires file input)
-        temp_path = f"/tmp/voice_input_{hashlib.md5(audio_bytes).hexdigest()}.webm"
-        with open(temp_path, "wb") as f:
-            f.write(audio_bytes)
+        async def chained() -> AsyncGenerator[bytes, None]:
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
         
+        return chained()
+
+    async def stream_tts(self, audio_id: str) -> AsyncGenerator[bytes, None]:
+        """Yield the audio for ``audio_id``, streaming it from the API if needed."""
+        cached = self.get_cached_audio(audio_id)
+        if cached is not None:
+            yield cached
+            return
+        
+        # Read before the first await so eviction can't drop the text mid-request
+        text = self.tts_pending.get(audio_id)
+        
+        # A synthesis or stream already running: wait for it rather than
+        # paying for the same audio twice
+        task = self._tts_inflight.get(audio_id)
+        if task is not None:
+            try:
+                result = await asyncio.shield(task)
+            except Exception:
+                result = None  # fall back to streaming it ourselves
+            if result is not None:
+                yield result[0]
+                return
+        
+        if text is None:
+            return
+        
+        # Register the stream so concurrent fetches wait on it; resolves to
+        # (audio_bytes, audio_id), or None if the stream did not complete
+        done = asyncio.get_running_loop().create_future()
+        self._tts_inflight[audio_id] = done
         try:
-            with open(temp_path, "rb") as f:
-                transcript = await self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=f,
-                    language="en",
-                )
+            logger.info(f"Streaming TTS for: {text[:50]}...")
+            chunks = []
+            async with self.client.audio.speech.with_streaming_response.create(
+                model=self.TTS_MODEL,
+                voice=self.tts_voice,
+                input=text,
+                response_format="mp3",
+            ) as response:
+                async for chunk in response.iter_bytes(4096):
+                    chunks.append(chunk)
+                    yield chunk
             
-            logger.info(f"Transcribed: {transcript.text}")
-            return transcript.text
+            # Only complete audio is cached; a failed stream stays pending for retry
+            audio_bytes = b"".join(chunks)
+            await self._store_audio(audio_id, audio_bytes)
+            done.set_result((audio_bytes, audio_id))
+            logger.debug(f"TTS streamed: {audio_id}, size: {len(audio_bytes)} bytes")
         finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            if not done.done():
+                done.set_result(None)
+            if self._tts_inflight.get(audio_id) is done:
+                del self._tts_inflight[audio_id]
+
+    def synthesize_in_background(self, text: str) -> None:
+        """Start synthesizing ``text`` now so a later fetch finds it ready."""
+        cache_key = self._tts_key(text)
+        if cache_key in self._tts_inflight or self.get_cached_audio(cache_key) is not None:
+            return
+        task = asyncio.create_task(self.generate_tts(text))
+        self._tts_inflight[cache_key] = task
+        task.add_done_callback(lambda t: self._background_tts_done(cache_key, t))
+
+    def _background_tts_done(self, cache_key: str, task: asyncio.Task) -> None:
+        self._tts_inflight.pop(cache_key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background TTS failed for {cache_key}: {task.exception()}")
+
+    async def transcribe_audio(self, audio_bytes: bytes) -> str:
+        """Transcribe audio using Whisper API."""
+        logger.info(f"Transcribing audio, size: {len(audio_bytes)} bytes")
+        
+        # Upload straight from memory; the filename only tells Whisper the format
+        transcript = await self.client.audio.transcriptions.create(
+            model="whisper-1",
+            file=("audio.webm", io.BytesIO(audio_bytes), "audio/webm"),
+            language="en",
+        )
+        
+        logger.info(f"Transcribed: {transcript.text}")
+        return transcript.text
 
     def get_cached_audio(self, audio_id: str) -> Optional[bytes]:
-        """Retrieve cached TTS audio by ID."""
-        return self.tts_cache.get(audio_id)
+        """Retrieve cached TTS audio by ID (memory first, then disk)."""
+        audio = self.tts_cache.get(audio_id)
+        if audio is not None:
+            self.tts_cache.move_to_end(audio_id)
+            return audio
+        if audio_id not in self._persisted_ids:
+            return None
+        path = self._audio_path(audio_id)
+        try:
+            audio = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        self._remember_audio(audio_id, audio)
+        return audio
+
+    async def warm_cache(self) -> None:
+        """Pre-synthesize every fixed prompt so first sessions skip the TTS round-trip."""
+        try:
+            removed = await asyncio.to_thread(self._prune_audio_files)
+        except OSError as e:
+            logger.warning(f"Could not prune TTS cache dir: {e}")
+        else:
+            if removed:
+                logger.info(f"TTS cache: removed {removed} stale files")
+        results = await asyncio.gather(
+            *(self.generate_tts(text) for text in _CONSTANT_PROMPTS),
+            return_exceptions=True,
+        )
+        failed = sum(isinstance(r, Exception) for r in results)
+        if failed:
+            logger.warning(f"TTS warm-up: {failed}/{len(results)} prompts failed")
+        else:
+            logger.info(f"TTS warm-up: cached {len(results)} prompts")
 
     # ── Fuzzy matching utilities ────────────────────────────────────────
 
@@ -123,20 +412,26 @@ class VoiceAgent:
         # First try to find all categories mentioned in the input
         matched_categories = []
         user_lower = user_input.lower()
+        fuzzy_choices = {}
         
-        # Check each category individually
-        for category in categories:
+        for i, category in enumerate(categories):
             category_lower = category.lower()
-            
-            # Check for exact match in the input
             if category_lower in user_lower:
                 matched_categories.append((category, 100.0))
-                continue
-            
-            # Use fuzzy matching for individual category
-            score = fuzz.token_set_ratio(user_input, category)
-            if score > 50:  # Lower threshold for better matching
-                matched_categories.append((category, score))
+            else:
+                fuzzy_choices[i] = category_lower
+        
+        # Score the rest in one batch call (lower threshold for better matching)
+        if fuzzy_choices:
+            for _, score, i in process.extract(
+                user_lower,
+                fuzzy_choices,
+                scorer=fuzz.token_set_ratio,
+                score_cutoff=50,
+                limit=None,
+            ):
+                if score > 50:
+                    matched_categories.append((categories[i], score))
         
         # Sort by score descending
         matched_categories.sort(key=lambda x: x[1], reverse=True)
@@ -144,59 +439,38 @@ class VoiceAgent:
         logger.debug(f"Fuzzy match '{user_input}' against {categories} -> {matched_categories}")
         return matched_categories
 
+    def is_filler(self, user_input: str) -> bool:
+        """True when the input is empty or only hesitation sounds ("uh", "um")."""
+        return all(
+            word in _FILLER_WORDS
+            for word in _NON_WORD_RE.split(user_input.lower())
+            if word
+        )
+
     def extract_yes_no(self, user_input: str) -> Optional[bool]:
         """Extract yes/no from user input. Returns True for yes, False for no, None if unclear."""
-        text = user_input.lower().strip()
+        words = set(_WORD_RE.findall(user_input.lower()))
         
         # Positive responses
-        if any(word in text for word in ["yes", "yeah", "yep", "sure", "correct", "right", "ok", "okay"]):
+        if not words.isdisjoint(_YES_WORDS):
             return True
         
         # Negative responses
-        if any(word in text for word in ["no", "nope", "nah", "incorrect", "wrong"]):
+        if not words.isdisjoint(_NO_WORDS):
             return False
         
         return None
 
     def words_to_numbers(self, text: str) -> str:
         """Convert word numbers to digits (e.g., 'one hundred' -> '100')."""
-        # Common word to number mappings
-        word_to_num = {
-            'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-            'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
-            'ten': '10', 'eleven': '11', 'twelve': '12', 'thirteen': '13',
-            'fourteen': '14', 'fifteen': '15', 'sixteen': '16', 'seventeen': '17',
-            'eighteen': '18', 'nineteen': '19', 'twenty': '20', 'thirty': '30',
-            'forty': '40', 'fifty': '50', 'sixty': '60', 'seventy': '70',
-            'eighty': '80', 'ninety': '90', 'hundred': '100', 'thousand': '1000'
-        }
-        
-        words = text.lower().split()
-        result = []
-        i = 0
-        
-        while i < len(words):
-            word = words[i]
-            
-            # Check for simple word-to-number conversion
-            if word in word_to_num:
-                # Handle "one hundred", "two hundred", etc.
-                if i > 0 and result and result[-1].isdigit() and word == 'hundred':
-                    result[-1] = str(int(result[-1]) * 100)
-                elif i > 0 and result and result[-1].isdigit() and word == 'thousand':
-                    result[-1] = str(int(result[-1]) * 1000)
-                # Handle "twenty one", "thirty five", etc.
-                elif i + 1 < len(words) and words[i + 1] in word_to_num and int(word_to_num.get(words[i + 1], 0)) < 10:
-                    result.append(str(int(word_to_num[word]) + int(word_to_num[words[i + 1]])))
-                    i += 1  # Skip next word
-                else:
-                    result.append(word_to_num[word])
-            else:
-                result.append(word)
-            
-            i += 1
-        
-        return ' '.join(result)
+        text = " ".join(text.lower().split())
+        text = _NUMBER_WORD_RE.sub(lambda m: _NUMBER_WORDS[m.group(0)], text)
+        # "twenty one" / "twenty-one" -> "21"
+        text = _COMPOUND_RE.sub(lambda m: str(int(m.group(1)) + int(m.group(2))), text)
+        # "5 hundred" -> "500", then "500 thousand" -> "500000"
+        text = _HUNDRED_RE.sub(lambda m: str(int(m.group(1)) * 100), text)
+        text = _THOUSAND_RE.sub(lambda m: str(int(m.group(1)) * 1000), text)
+        return _MULTIPLIER_RE.sub(lambda m: _MULTIPLIERS[m.group(0)], text)
 
     # ── State initialization ────────────────────────────────────────────
 
@@ -238,44 +512,52 @@ class VoiceAgent:
         phase = state.get("phase", "greeting")
         logger.info(f"Processing voice input in phase: {phase}")
         
+        # Silence / filler-only transcripts: re-prompt without touching the flow
+        if phase not in _INPUTLESS_PHASES and self.is_filler(transcribed_text):
+            logger.info(f"Filler-only input ignored: {transcribed_text!r}")
+            text = _DIDNT_HEAR_TEXT
+            audio_id = self.prepare_tts(text)
+            return {"text": text, "audio_id": audio_id, "phase": phase, "data": {}}
+        
         # Route to appropriate handler
-        if phase == "greeting":
-            return await self.handle_greeting_phase(context, state)
-        elif phase == "event_type":
-            return await self.handle_event_type_phase(context, state, transcribed_text)
-        elif phase == "category_confirmation":
-            return await self.handle_category_confirmation(context, state, transcribed_text)
-        elif phase == "category_selection":
-            return await self.handle_category_selection_phase(context, state, transcribed_text)
-        elif phase == "subcategory_selection":
-            return await self.handle_subcategory_selection_phase(context, state, transcribed_text)
-        elif phase == "completion_check":
-            return await self.handle_completion_check_phase(context, state, transcribed_text)
-        elif phase == "form_collection":
-            return await self.handle_form_collection_phase(context, state, transcribed_text)
-        elif phase == "shopping_list_readout_prompt":
-            return await self.handle_shopping_list_prompt(context, state, transcribed_text)
-        elif phase == "shopping_list_readout":
-            return await self.handle_shopping_list_readout(context, state, transcribed_text)
-        elif phase == "purchase_confirmation":
-            return await self.handle_purchase_confirmation(context, state, transcribed_text)
-        elif phase == "done":
-            return await self.handle_done_phase(context, state)
-        else:
+        handler = self._phase_handlers.get(phase)
+        if handler is None:
             return await self.handle_error(f"Unknown phase: {phase}")
+        return await handler(context, state, transcribed_text)
 
     # ── Phase handlers ──────────────────────────────────────────────────
 
     async def handle_greeting_phase(self, context: Context, state: dict) -> dict:
         """Initial greeting - ask what they're organizing."""
-        text = "Hello, please tell me what you are organizing so I can further assist you."
-        audio_bytes, audio_id = await self.generate_tts(text)
+        text = _GREETING_TEXT
+        audio_id = self.prepare_tts(text)
         
         state["phase"] = "event_type"
         context.save_voice_state(state)
         
         return {"text": text, "audio_id": audio_id, "phase": "event_type", "data": {}}
 
+    async def _collect_trees(
+        self, context: Context, prompt: str, log_prefix: str = ""
+    ) -> tuple[list, list]:
+        """Run one TreeAgent turn and return the (people_tree, place_tree) it emitted."""
+        people_tree = []
+        place_tree = []
+        async for frame in self.tree_agent.stream_response(context, prompt):
+            # Only tree frames are parsed; text and error frames are skipped
+            if frame.startswith(_PEOPLE_TREE_FRAME):
+                people_tree = json_utils.loads(frame).get("nodes", [])
+                logger.info(f"{log_prefix}Got people_tree with {len(people_tree)} nodes")
+            elif frame.startswith(_PLACE_TREE_FRAME):
+                place_tree = json_utils.loads(frame).get("nodes", [])
+                logger.info(f"{log_prefix}Got place_tree with {len(place_tree)} nodes")
+        return people_tree, place_tree
+
+    @staticmethod
+    def _tree_cache_key(event_description: str) -> str:
+        """Normalize an event description so trivial variations share a key."""
+        return _NON_WORD_RE.sub(" ", event_description.lower()).strip()
+
     async def handle_event_type_phase(
         self, context: Context, state: dict, user_input: str
     ) -> dict:
@@ -283,44 +565,49 @@ class VoiceAgent:
         logger.info(f"Event type: {user_input}")
         state["event_description"] = user_input
         
-        # Generate trees using TreeAgent
-        logger.info("Generating trees with TreeAgent...")
-        people_tree = []
-        place_tree = []
-        
-        try:
-            async for output_json in self.tree_agent.stream_response(context, user_input):
-                output = json.loads(output_json)
-                logger.debug(f"TreeAgent output type: {output.get('type')}")
-                if output.get("type") == "people_tree":
-                    people_tree = output.get("nodes", [])
-                    logger.info(f"Got people_tree with {len(people_tree)} nodes")
-                elif output.get("type") == "place_tree":
-                    place_tree = output.get("nodes", [])
-                    logger.info(f"Got place_tree with {len(place_tree)} nodes")
-        except Exception as e:
-            logger.error(f"Error generating trees: {e}", exc_info=True)
-            return await self.handle_error(f"Failed to generate event plan: {str(e)}")
-        
-        # Save trees to context
-        if people_tree or place_tree:
+        # Identical event descriptions reuse the trees generated earlier
+        tree_key = self._tree_cache_key(user_input)
+        cached = self.tree_cache.get(tree_key)
+        if cached is not None:
+            self.tree_cache.move_to_end(tree_key)
+            people_tree, place_tree, turns = json_utils.loads(cached)
+            logger.info("Tree cache hit for event description")
+            # Replay the history the TreeAgent turn recorded, under this input
+            context.add_message("user", user_input)
+            for role, content in turns[1:]:
+                context.add_message(role, content)
             context.save_trees(people_tree, place_tree)
         else:
-            # If no trees generated, try again with more explicit prompt
-            logger.warning("No trees generated, retrying with explicit prompt")
-            enhanced_prompt = f"Create a complete event planning tree for: {user_input}. Include both people-related needs (food, drinks, etc.) and place-related needs (furniture, decorations, etc.)."
+            # Generate trees using TreeAgent
+            logger.info("Generating trees with TreeAgent...")
+            history_start = len(context.conversation)
+            try:
+                people_tree, place_tree = await self._collect_trees(context, user_input)
+            except Exception as e:
+                logger.error(f"Error generating trees: {e}", exc_info=True)
+                return await self.handle_error(f"Failed to generate event plan: {str(e)}")
             
-            async for output_json in self.tree_agent.stream_response(context, enhanced_prompt):
-                output = json.loads(output_json)
-                if output.get("type") == "people_tree":
-                    people_tree = output.get("nodes", [])
-                    logger.info(f"Retry: Got people_tree with {len(people_tree)} nodes")
-                elif output.get("type") == "place_tree":
-                    place_tree = output.get("nodes", [])
-                    logger.info(f"Retry: Got place_tree with {len(place_tree)} nodes")
+            if not (people_tree or place_tree):
+                # If no trees generated, try again with more explicit prompt
+                logger.warning("No trees generated, retrying with explicit prompt")
+                enhanced_prompt = f"Create a complete event planning tree for: {user_input}. Include both people-related needs (food, drinks, etc.) and place-related needs (furniture, decorations, etc.)."
+                people_tree, place_tree = await self._collect_trees(
+                    context, enhanced_prompt, log_prefix="Retry: "
+                )
             
+            # Save trees to context
             if people_tree or place_tree:
                 context.save_trees(people_tree, place_tree)
+            if people_tree:
+                # Stored serialized so later selection edits can't leak back in,
+                # with the messages the turn added so a hit leaves the same history
+                turns = [
+                    (msg.role, msg.content)
+                    for msg in context.conversation[history_start:]
+                ]
+                self.tree_cache[tree_key] = json_utils.dumps_bytes([people_tree, place_tree, turns])
+                while len(self.tree_cache) > self.TREE_CACHE_SIZE:
+                    self.tree_cache.popitem(last=False)
         
         # Extract top-level category names
         categories = [node["label"] for node in people_tree]
@@ -332,10 +619,10 @@ class VoiceAgent:
         state["phase"] = "category_selection"
         context.save_voice_state(state)
         
-        categories_str = ", ".join(categories[:-1]) + f" and {categories[-1]}" if len(categories) > 1 else categories[0]
+        categories_str = _join_and(categories)
         text = f"I've prepared a plan for your event. The main categories are: {categories_str}. Which of these do you need? You can say them one by one or all at once."
         
-        audio_bytes, audio_id = await self.generate_tts(text)
+        audio_id = self.prepare_tts(text)
         return {
             "text": text,
             "audio_id": audio_id,
@@ -354,8 +641,8 @@ class VoiceAgent:
         matches = self.fuzzy_match_categories(user_input, categories)
         
         if not matches:
-            text = "I didn't catch any valid categories. Could you repeat which categories you need?"
-            audio_bytes, audio_id = await self.generate_tts(text)
+            text = _NO_VALID_CATEGORIES_TEXT
+            audio_id = self.prepare_tts(text)
             return {"text": text, "audio_id": audio_id, "phase": "category_selection", "data": {}}
         
         # Check if all matches are perfect (100 score) - skip confirmation for exact matches
@@ -364,7 +651,7 @@ class VoiceAgent:
         
         if all_perfect and high_confidence:
             # Perfect matches - accept immediately without confirmation
-            matched_str = ", ".join(high_confidence[:-1]) + f" and {high_confidence[-1]}" if len(high_confidence) > 1 else high_confidence[0]
+            matched_str = _join_and(high_confidence)
             logger.info(f"Perfect match(es): {high_confidence}, skipping confirmation")
             
             state["selected_categories"] = high_confidence
@@ -377,9 +664,9 @@ class VoiceAgent:
             
         elif high_confidence:
             # High confidence but not perfect - ask for confirmation
-            matched_str = ", ".join(high_confidence[:-1]) + f" and {high_confidence[-1]}" if len(high_confidence) > 1 else high_confidence[0]
+            matched_str = _join_and(high_confidence)
             text = f"I heard {matched_str}. Is that correct?"
-            audio_bytes, audio_id = await self.generate_tts(text)
+            audio_id = self.prepare_tts(text)
             
             state["pending_confirmation"] = {
                 "type": "categories",
@@ -392,7 +679,7 @@ class VoiceAgent:
         else:
             # Low confidence - ask for clarification
             text = f"I think you said {matches[0][0]}, but I'm not sure. Could you repeat which categories you need?"
-            audio_bytes, audio_id = await self.generate_tts(text)
+            audio_id = self.prepare_tts(text)
             return {"text": text, "audio_id": audio_id, "phase": "category_selection", "data": {}}
 
     async def handle_category_confirmation(
@@ -415,8 +702,8 @@ class VoiceAgent:
             return await self.start_subcategory_selection(context, state)
         elif confirmation is False:
             # User rejected - go back to category selection
-            text = "Okay, which categories do you need?"
-            audio_bytes, audio_id = await self.generate_tts(text)
+            text = _ASK_CATEGORIES_TEXT
+            audio_id = self.prepare_tts(text)
             
             state["pending_confirmation"] = None
             state["phase"] = "category_selection"
@@ -425,8 +712,8 @@ class VoiceAgent:
             return {"text": text, "audio_id": audio_id, "phase": "category_selection", "data": {}}
         else:
             # Unclear - ask again
-            text = "I didn't understand. Please say yes or no."
-            audio_bytes, audio_id = await self.generate_tts(text)
+            text = _YES_NO_RETRY_TEXT
+            audio_id = self.prepare_tts(text)
             return {"text": text, "audio_id": audio_id, "phase": "category_confirmation", "data": {}}
 
     async def start_subcategory_selection(self, context: Context, state: dict) -> dict:
@@ -443,12 +730,7 @@ class VoiceAgent:
         current_category = selected_categories[current_index]
         
         # Find the category node in people_tree
-        people_tree = context.people_tree or []
-        category_node = None
-        for node in people_tree:
-            if node["label"] == current_category:
-                category_node = node
-                break
+        category_node = context.find_people_node(current_category)
         
         if not category_node or not category_node.get("children"):
             # No subcategories - move to next category
@@ -458,10 +740,10 @@ class VoiceAgent:
         
         # List subcategories
         subcategories = [child["label"] for child in category_node["children"]]
-        subcat_str = ", ".join(subcategories[:-1]) + f" and {subcategories[-1]}" if len(subcategories) > 1 else subcategories[0]
+        subcat_str = _join_and(subcategories)
         
         text = f"For {current_category}, the options are: {subcat_str}. Which do you need?"
-        audio_bytes, audio_id = await self.generate_tts(text)
+        audio_id = self.prepare_tts(text)
         
         return {
             "text": text,
@@ -488,11 +770,7 @@ class VoiceAgent:
         
         # Find category node
         people_tree = context.people_tree or []
-        category_node = None
-        for node in people_tree:
-            if node["label"] == current_category:
-                category_node = node
-                break
+        category_node = context.find_people_node(current_category)
         
         if not category_node:
             return await self.handle_error("Category not found")
@@ -504,9 +782,9 @@ class VoiceAgent:
         
         if not matches:
             # List the subcategories again to help user
-            subcat_str = ", ".join(subcategories[:-1]) + f" and {subcategories[-1]}" if len(subcategories) > 1 else subcategories[0]
+            subcat_str = _join_and(subcategories)
             text = f"I didn't catch any valid subcategories for {current_category}. The options are: {subcat_str}. Which do you need?"
-            audio_bytes, audio_id = await self.generate_tts(text)
+            audio_id = self.prepare_tts(text)
             return {"text": text, "audio_id": audio_id, "phase": "subcategory_selection", "data": {}}
         
         # Mark matched subcategories as selected (lower threshold)
@@ -535,8 +813,8 @@ class VoiceAgent:
 
     async def handle_completion_check_start(self, context: Context, state: dict) -> dict:
         """Ask user if they're done or want to add more."""
-        text = "We've gone through your selected categories. Would you like to hear the remaining categories, add more specific categories, or are you done and ready to proceed?"
-        audio_bytes, audio_id = await self.generate_tts(text)
+        text = _COMPLETION_CHECK_TEXT
+        audio_id = self.prepare_tts(text)
         return {"text": text, "audio_id": audio_id, "phase": "completion_check", "data": {}}
 
     async def handle_completion_check_phase(
@@ -546,32 +824,32 @@ class VoiceAgent:
         user_lower = user_input.lower()
         
         # Check if user wants to hear remaining categories
-        if any(word in user_lower for word in ["remaining", "rest", "other", "more categories", "what else"]):
+        if _HEAR_REMAINING_RE.search(user_lower):
             people_tree = context.people_tree or []
             selected_cats = state.get("selected_categories", [])
             remaining = [node["label"] for node in people_tree if node["label"] not in selected_cats]
             
             if remaining:
-                remaining_str = ", ".join(remaining[:-1]) + f" and {remaining[-1]}" if len(remaining) > 1 else remaining[0]
+                remaining_str = _join_and(remaining)
                 text = f"The remaining categories are: {remaining_str}. Which of these do you need?"
                 state["phase"] = "category_selection"
                 context.save_voice_state(state)
             else:
-                text = "There are no remaining categories. Are you ready to proceed?"
+                text = _NO_REMAINING_TEXT
             
-            audio_bytes, audio_id = await self.generate_tts(text)
+            audio_id = self.prepare_tts(text)
             return {"text": text, "audio_id": audio_id, "phase": state["phase"], "data": {}}
         
         # Check if user wants to add more categories
-        elif any(word in user_lower for word in ["add", "more", "another", "also"]):
-            text = "Which additional categories would you like to add?"
+        elif _ADD_MORE_RE.search(user_lower):
+            text = _ASK_ADDITIONAL_TEXT
             state["phase"] = "category_selection"
             context.save_voice_state(state)
-            audio_bytes, audio_id = await self.generate_tts(text)
+            audio_id = self.prepare_tts(text)
             return {"text": text, "audio_id": audio_id, "phase": "category_selection", "data": {}}
         
         # Check if user is done
-        elif any(word in user_lower for word in ["done", "proceed", "ready", "continue", "yes", "finish"]):
+        elif _DONE_RE.search(user_lower):
             # Move to form collection
             state["phase"] = "form_collection"
             state["form_field_index"] = 0
@@ -580,8 +858,8 @@ class VoiceAgent:
         
         else:
             # Unclear - ask again
-            text = "I didn't understand. Would you like to hear the remaining categories, add more, or are you done?"
-            audio_bytes, audio_id = await self.generate_tts(text)
+            text = _COMPLETION_RETRY_TEXT
+            audio_id = self.prepare_tts(text)
             return {"text": text, "audio_id": audio_id, "phase": "completion_check", "data": {}}
 
     async def start_form_collection(self, context: Context, state: dict) -> dict:
@@ -595,7 +873,7 @@ class VoiceAgent:
         
         field = form_fields[field_index]
         text = f"What is the {field['label'].lower()} for your event?"
-        audio_bytes, audio_id = await self.generate_tts(text)
+        audio_id = self.prepare_tts(text)
         
         return {
             "text": text,
@@ -635,9 +913,10 @@ class VoiceAgent:
                 form_data_list.append(TextFieldChunk(label=f["label"], content=f["value"] or ""))
             context.save_form(form_data_list)
             
-            # Immediately generate shopping list without waiting for more input
+            # Immediately generate shopping list without waiting for more input.
+            # No TTS for this lead-in on its own: it is only ever spoken as part
+            # of the final reply below.
             text = confirmation + " I have all the information I need. Let me prepare your shopping list."
-            audio_bytes, audio_id = await self.generate_tts(text)
             
             # Generate shopping list right away
             logger.info("All form fields collected, generating shopping list...")
@@ -665,12 +944,13 @@ class VoiceAgent:
                 state["shopping_list_items"] = items
                 state["shopping_list_generated"] = True
                 state["cart"] = cart.model_dump()
+                self._prefetch_cart_audio(state["cart"])
                 state["phase"] = "shopping_list_readout_prompt"
                 context.save_voice_state(state)
                 
                 # Append the question about reading the list
                 text = text + f" I've prepared your shopping list with {len(items)} items. Would you like me to read it out?"
-                audio_bytes, audio_id = await self.generate_tts(text)
+                audio_id = self.prepare_tts(text)
                 
                 return {
                     "text": text,
@@ -685,7 +965,7 @@ class VoiceAgent:
             # Ask for next field
             next_field = form_fields[field_index]
             text = confirmation + f" What is the {next_field['label'].lower()}?"
-            audio_bytes, audio_id = await self.generate_tts(text)
+            audio_id = self.prepare_tts(text)
             
             return {
                 "text": text,
@@ -717,11 +997,12 @@ class VoiceAgent:
         state["shopping_list_items"] = items
         state["shopping_list_generated"] = True
         state["cart"] = cart.model_dump()
+        self._prefetch_cart_audio(state["cart"])
         state["phase"] = "shopping_list_readout_prompt"
         context.save_voice_state(state)
         
-        text = "I've prepared your shopping list. Would you like me to read it out?"
-        audio_bytes, audio_id = await self.generate_tts(text)
+        text = _LIST_READY_TEXT
+        audio_id = self.prepare_tts(text)
         
         return {
             "text": text,
@@ -747,8 +1028,8 @@ class VoiceAgent:
             context.save_voice_state(state)
             return await self.start_purchase_confirmation(context, state)
         else:
-            text = "I didn't understand. Would you like me to read out the shopping list? Please say yes or no."
-            audio_bytes, audio_id = await self.generate_tts(text)
+            text = _READOUT_RETRY_TEXT
+            audio_id = self.prepare_tts(text)
             return {"text": text, "audio_id": audio_id, "phase": "shopping_list_readout_prompt", "data": {}}
 
     async def read_shopping_list(self, context: Context, state: dict) -> dict:
@@ -758,15 +1039,30 @@ class VoiceAgent:
         total_price = cart_data.get("price", 0.0)
         
         if not items:
-            text = "The shopping list is empty."
-            audio_bytes, audio_id = await self.generate_tts(text)
+            text = _EMPTY_LIST_TEXT
+            audio_id = self.prepare_tts(text)
             state["phase"] = "purchase_confirmation"
             context.save_voice_state(state)
             return {"text": text, "audio_id": audio_id, "phase": "purchase_confirmation", "data": {}}
         
-        # Build readout text
+        text = self._format_readout(cart_data)
+        audio_id = self.prepare_tts(text)
+        
+        state["phase"] = "purchase_confirmation"
+        context.save_voice_state(state)
+        
+        return {
+            "text": text,
+            "audio_id": audio_id,
+            "phase": "purchase_confirmation",
+            "data": {"total": total_price}
+        }
+
+    @staticmethod
+    def _format_readout(cart_data: dict) -> str:
+        """Spoken shopping-list readout for a cart (``cart.model_dump()``)."""
         readout_parts = ["Here is your shopping list:"]
-        for item in items:
+        for item in cart_data.get("items", []):
             recommended = item.get("recommendedItem", {}) or item.get("recommended_item", {})
             name = recommended.get("name", "Unknown item")
             amount = recommended.get("amount", 0)
@@ -777,28 +1073,27 @@ class VoiceAgent:
                 f"{name}, quantity {amount} pieces, at the price of {price:.2f} euros each, totaling {item_total:.2f} euros."
             )
         
-        readout_parts.append(f"The total cost is {total_price:.2f} euros.")
-        
-        text = " ".join(readout_parts)
-        audio_bytes, audio_id = await self.generate_tts(text)
-        
-        state["phase"] = "purchase_confirmation"
-        context.save_voice_state(state)
-        
-        return {
-            "text": text,
-            "audio_id": audio_id,
-            "phase": "purchase_confirmation",
-            "data": {"total": total_price}
-        }
+        readout_parts.append(f"The total cost is {cart_data.get('price', 0.0):.2f} euros.")
+        return " ".join(readout_parts)
+
+    @staticmethod
+    def _purchase_prompt(cart_data: dict) -> str:
+        total_price = cart_data.get("price", 0.0)
+        return f"Would you like to continue with the purchase for a total of {total_price:.2f} euros?"
+
+    def _prefetch_cart_audio(self, cart_data: dict) -> None:
+        """Synthesize the readout and purchase prompt while the user answers."""
+        if cart_data.get("items"):
+            self.synthesize_in_background(self._format_readout(cart_data))
+        self.synthesize_in_background(self._purchase_prompt(cart_data))
 
     async def start_purchase_confirmation(self, context: Context, state: dict) -> dict:
         """Ask if user wants to proceed with purchase."""
         cart_data = state.get("cart", {})
         total_price = cart_data.get("price", 0.0)
         
-        text = f"Would you like to continue with the purchase for a total of {total_price:.2f} euros?"
-        audio_bytes, audio_id = await self.generate_tts(text)
+        text = self._purchase_prompt(cart_data)
+        audio_id = self.prepare_tts(text)
         
         return {
             "text": text,
@@ -814,17 +1109,17 @@ class VoiceAgent:
         confirmation = self.extract_yes_no(user_input)
         
         if confirmation is True:
-            text = "Great! Your purchase was successful. Thank you for using our service!"
+            text = _PURCHASE_DONE_TEXT
             state["phase"] = "done"
             context.save_voice_state(state)
         elif confirmation is False:
-            text = "No problem. Your shopping list has been saved. You can come back anytime to complete your purchase."
+            text = _PURCHASE_SAVED_TEXT
             state["phase"] = "done"
             context.save_voice_state(state)
         else:
-            text = "I didn't understand. Would you like to continue with the purchase? Please say yes or no."
+            text = _PURCHASE_RETRY_TEXT
         
-        audio_bytes, audio_id = await self.generate_tts(text)
+        audio_id = self.prepare_tts(text)
         return {
             "text": text,
             "audio_id": audio_id,
@@ -834,12 +1129,12 @@ class VoiceAgent:
 
     async def handle_done_phase(self, context: Context, state: dict) -> dict:
         """Handle done state."""
-        text = "The voice session is complete. Thank you!"
-        audio_bytes, audio_id = await self.generate_tts(text)
+        text = _SESSION_DONE_TEXT
+        audio_id = self.prepare_tts(text)
         return {"text": text, "audio_id": audio_id, "phase": "done", "data": {}}
 
     async def handle_error(self, error_message: str) -> dict:
         """Handle error state."""
         text = f"I'm sorry, there was an error: {error_message}. Please try again."
-        audio_bytes, audio_id = await self.generate_tts(text)
+        audio_id = self.prepare_tts(text)
         return {"text": text, "audio_id": audio_id, "phase": "error", "data": {"error": error_message}}
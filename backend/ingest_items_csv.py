@@ -20,6 +20,9 @@ from app.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Rows handed to RAGPipeline.ingest_texts per call (bounds memory and paces progress logs)
+INGEST_CHUNK_SIZE = 512
+
 
 def header_to_label(header: str) -> str:
     """Turn CSV header into a readable label (e.g. delivery_estimate -> Delivery Estimate)."""
@@ -83,7 +86,7 @@ def main():
     source_name = csv_path.name
     logger.info("Ingesting %d rows from %s", len(rows), csv_path)
 
-    ingested = 0
+    texts, doc_ids, metadatas = [], [], []
     for i, row in enumerate(rows):
         text = row_to_text(row, headers)
         
@@ -121,14 +124,20 @@ def main():
             except (ValueError, TypeError):
                 logger.warning(f"Row {i}: Invalid price value: {row['price']}")
         
-        rag.ingest_text(
-            text,
-            doc_id=doc_id,
-            metadata=metadata,
+        texts.append(text)
+        doc_ids.append(doc_id)
+        metadatas.append(metadata)
+
+    # Embed and add in chunks: one encode/add round trip per chunk instead of per row
+    ingested = 0
+    for start in range(0, len(texts), INGEST_CHUNK_SIZE):
+        end = start + INGEST_CHUNK_SIZE
+        ingested += rag.ingest_texts(
+            texts[start:end],
+            doc_ids[start:end],
+            metadatas[start:end],
         )
-        ingested += 1
-        if (i + 1) % 10 == 0:
-            logger.info("  %d / %d rows ingested", i + 1, len(rows))
+        logger.info("  %d / %d rows ingested", min(end, len(texts)), len(rows))
 
     logger.info("Done. Ingested %d items into the vector database.", ingested)
     return 0
@@ -3,6 +3,7 @@ from fastapi.responses import StreamingResponse, HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
+import asyncio
 import json
 import os
 import time
@@ -25,6 +26,7 @@ from app.shopping_list_agent import ShoppingListAgent
 from app.shopping_agent import ShoppingAgent
 from app.voice_agent import VoiceAgent
 from app.rag_pipeline import RAGPipeline
+from app.openai_client import close_openai_clients
 from app.tools import tools
 from app.logger import setup_logging, get_logger
 from app.rag_pipeline import RAGPipeline
@@ -133,6 +135,18 @@ voice_agent = VoiceAgent(
     shopping_agent=shopping_agent,
 )
 
+
+@app.on_event("startup")
+async def warm_voice_cache():
+    # Runs in the background so a slow or unreachable TTS API can't block boot
+    app.state.tts_warmup = asyncio.create_task(voice_agent.warm_cache())
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await close_openai_clients()
+
+
 # In-memory session store (swap for DB in production)
 sessions: dict[str, Context] = {}
 
@@ -331,10 +345,10 @@ async def chat_stream(request: ChatRequest):
 
     async def generate():
         try:
-            async for output_json in tree_agent.stream_response(
+            async for batch in tree_agent.stream_batches(
                 context, request.message
             ):
-                yield f"data: {output_json}\n\n"
+                yield b"".join([b"data: " + frame + b"\n\n" for frame in batch])
         except Exception as e:
             logger.error(f"/chat stream error: {e}", exc_info=True)
             error = ErrorOutput(message=str(e), code="STREAM_ERROR")
@@ -631,21 +645,34 @@ async def voice_input(
     "/tts-audio/{audio_id}",
     tags=["Voice"],
     summary="Get TTS audio file",
-    description="Returns cached TTS audio file by ID.",
+    description="Returns TTS audio by ID, streaming it while it is synthesized.",
 )
 async def get_tts_audio(audio_id: str):
     logger.info(f"/tts-audio/{audio_id}")
     
     audio_bytes = voice_agent.get_cached_audio(audio_id)
-    if not audio_bytes:
+    if audio_bytes is not None:
+        return Response(
+            content=audio_bytes,
+            media_type="audio/mpeg",
+            headers={
+                "Cache-Control": "public, max-age=3600",
+                "Content-Disposition": f"inline; filename={audio_id}.mp3",
+            },
+        )
+    
+    # Uncached audio is synthesized and streamed as it arrives
+    stream = await voice_agent.open_tts_stream(audio_id)
+    if stream is None:
         logger.warning(f"Audio not found: {audio_id}")
         return Response(status_code=404, content="Audio not found")
     
-    return Response(
-        content=audio_bytes,
+    # A live stream can still fail part-way; never let a truncated clip be cached
+    return StreamingResponse(
+        stream,
         media_type="audio/mpeg",
         headers={
-            "Cache-Control": "public, max-age=3600",
+            "Cache-Control": "no-store",
             "Content-Disposition": f"inline; filename={audio_id}.mp3",
         },
     )